@@ -1,16 +1,21 @@
-from transformers import pipeline
-import spacy
 import re
+from functools import lru_cache
 
-# Initialize the sentiment analysis pipeline with a specific model
-sentiment_analyzer = pipeline(
-    "sentiment-analysis",
-    model="distilbert-base-uncased-finetuned-sst-2-english",
-    revision="af0f99b"
-)
+@lru_cache(maxsize=None)
+def get_sentiment_analyzer():
+    """Initializes the sentiment analysis pipeline with a specific model on first use."""
+    from transformers import pipeline
+    return pipeline(
+        "sentiment-analysis",
+        model="distilbert-base-uncased-finetuned-sst-2-english",
+        revision="af0f99b"
+    )
 
-# Load spaCy model
-nlp = spacy.load("en_core_web_sm")
+@lru_cache(maxsize=None)
+def get_nlp():
+    """Loads the spaCy model on first use."""
+    import spacy
+    return spacy.load("en_core_web_sm")
 
 # Define filler words
 FILLER_WORDS = {
@@ -76,7 +81,7 @@ def compute_sentiment(text):
             - score: The confidence score for the prediction (float between 0 and 1)
     """
     # Get sentiment analysis result
-    result = sentiment_analyzer(text)[0]
+    result = get_sentiment_analyzer()(text)[0]
     
     return {
         'label': result['label'],
@@ -106,7 +111,7 @@ def compute_filler_ratio(text):
         filler_count += len(re.findall(r'\b' + re.escape(filler) + r'\b', text_lower))
     
     # Use spaCy for accurate word counting (excluding punctuation)
-    doc = nlp(text)
+    doc = get_nlp()(text)
     total_words = len([token for token in doc if not token.is_punct])
     
     # Calculate ratio (avoid division by zero)
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import List, Dict, Any, Optional
+from constants import FILLER_WORDS, SENTIMENT_MODEL_NAME, SENTIMENT_MODEL_REVISION, SPACY_MODEL_NAME, \
+    SENTIMENT_MAX_TOKENS, SENTIMENT_WINDOW_OVERLAP, \
+    ANALYSIS_CACHE_PATH, ANALYSIS_CACHE_MAX_ENTRIES
+from sentiment_backends import sentiment_backend_id, loaded_sentiment_backend_id
+
+CACHE_SCHEMA_VERSION = 1
+
+def analysis_fingerprint() -> str:
+    """
+    Hash of everything that influences a turn's analysis result besides its
+    text. The sentiment backend is the one actually loaded once the model is
+    loaded (it differs from the configured one after a fallback), else the
+    configured one.
+    """
+    config = {
+        'schema': CACHE_SCHEMA_VERSION,
+        'sentiment_model': SENTIMENT_MODEL_NAME,
+        'sentiment_revision': SENTIMENT_MODEL_REVISION,
+        'sentiment_backend': loaded_sentiment_backend_id() or sentiment_backend_id(),
+        'sentiment_windows': [SENTIMENT_MAX_TOKENS, SENTIMENT_WINDOW_OVERLAP],
+        'spacy_model': SPACY_MODEL_NAME,
+        'filler_words': sorted(FILLER_WORDS),
+    }
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()
+
+class AnalysisCache:
+    """
+    Persistent SQLite cache of per-turn analysis results, shared across sessions
+    and transcripts. Entries are keyed by a hash of the turn text and the analysis
+    fingerprint, and the least recently used entries are evicted once the cache
+    holds more than max_entries turns. Processes with different fingerprints
+    (e.g. after changing the sentiment model or filler words, or after a backend
+    fallback) can share one cache file: their keys never collide, and entries
+    nobody reads any more are evicted as least recently used.
+    """
+
+    def __init__(self, path: str = ANALYSIS_CACHE_PATH, max_entries: int = ANALYSIS_CACHE_MAX_ENTRIES,
+                 fingerprint: Optional[str] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self._fingerprint = fingerprint
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS turns ("
+                "key BLOB PRIMARY KEY, label TEXT, score REAL, filler_count INTEGER, "
+                "total_words INTEGER, filler_ratio REAL, last_used INTEGER)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS turns_last_used ON turns (last_used)")
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        The analysis fingerprint keying this cache's entries. Unless one was
+        given, it is computed on first use after loading the sentiment model, so
+        it names the backend that actually loaded rather than the configured one.
+        """
+        if self._fingerprint is None:
+            from analysis_utils import load_sentiment_analyzer
+            load_sentiment_analyzer()
+            self._fingerprint = analysis_fingerprint()
+        return self._fingerprint
+
+    def _key(self, text: str) -> bytes:
+        return hashlib.sha256(f"{self.fingerprint}\0{text}".encode('utf-8')).digest()
+
+    def get_many(self, texts: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Looks up cached results for the given turn texts, in order. Missing turns
+        are returned as None. Each hit is a dictionary with 'label', 'score',
+        'count', 'total_words' and 'ratio'.
+        """
+        keys = [self._key(text) for text in texts]
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ','.join('?' * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, label, score, filler_count, total_words, filler_ratio FROM turns "
+                    f"WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, label, score, filler_count, total_words, filler_ratio in rows:
+                    found[key] = {'label': label, 'score': score, 'count': filler_count,
+                                  'total_words': total_words, 'ratio': filler_ratio}
+            if found:
+                now = time.time_ns()
+                self._conn.executemany("UPDATE turns SET last_used = ? WHERE key = ?",
+                                       [(now, key) for key in found])
+            self.hits += sum(1 for key in keys if key in found)
+            self.misses += sum(1 for key in keys if key not in found)
+        return [found.get(key) for key in keys]
+
+    def put_many(self, texts: List[str], results: List[Dict[str, Any]]) -> None:
+        """Stores results for the given turn texts. Failed ('ERROR') results are not cached."""
+        now = time.time_ns()
+        rows = [
+            (self._key(text), result['label'], result['score'], result['count'],
+             result['total_words'], result['ratio'], now)
+            for text, result in zip(texts, results) if result['label'] != 'ERROR'
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.executemany("INSERT OR REPLACE INTO turns VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            overflow = self._conn.execute("SELECT COUNT(*) FROM turns").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM turns WHERE key IN (SELECT key FROM turns ORDER BY last_used LIMIT ?)",
+                    (overflow,)
+                )
+                self.evictions += overflow
+            self._conn.execute("COMMIT")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM turns").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': (self.hits / lookups) if lookups > 0 else 0.0,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM turns")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,170 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Any, Optional
+from analysis_utils import Turn, TranscriptSource, iter_transcript_turns, iter_chunks, analyze_turn_results
+from result_columns import AnalysisColumns
+from transcript_formats import TranscriptTiming
+from instrumentation import recorder
+from constants import ANALYSIS_JOB_WORKERS, ANALYSIS_JOB_CHUNK_SIZE, ANALYSIS_JOB_MAX_JOBS
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, DONE, CANCELLED, FAILED = 'queued', 'running', 'done', 'cancelled', 'failed'
+
+class AnalysisJob:
+    """
+    Analysis of one transcript on a background thread. The transcript is parsed
+    first (so the number of turns is known), then analyzed in chunks of
+    chunk_size turns; each finished chunk is appended to the job's column store,
+    so partial results can be read at any time. Cancellation stops the job
+    between chunks and keeps the results of the chunks already done.
+    For timed transcripts, talk-time metrics are collected in self.timing while parsing.
+    """
+
+    def __init__(self, job_id: str, chunk_size: int = ANALYSIS_JOB_CHUNK_SIZE):
+        self.job_id = job_id
+        self.chunk_size = chunk_size
+        self.status = QUEUED
+        self.error: Optional[str] = None
+        self.turns: List[Turn] = []
+        self.timing = TranscriptTiming()
+        self.total_turns: Optional[int] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._columns = AnalysisColumns()
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._final_df = None
+
+    @property
+    def completed_turns(self) -> int:
+        return len(self._columns)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, CANCELLED, FAILED)
+
+    def cancel(self) -> None:
+        """Asks the job to stop after its current chunk (a queued job does not start)."""
+        self._cancel.set()
+
+    def progress(self) -> float:
+        """Fraction of turns analyzed, between 0 and 1."""
+        if self.status == DONE:
+            return 1.0
+        if not self.total_turns:
+            return 0.0
+        return min(1.0, self.completed_turns / self.total_turns)
+
+    def eta_seconds(self) -> Optional[float]:
+        """Remaining time extrapolated from the turns analyzed so far, or None before the first chunk."""
+        completed = self.completed_turns
+        if self.status != RUNNING or not completed or self.total_turns is None or self.started_at is None:
+            return None
+        elapsed = time.time() - self.started_at
+        return elapsed / completed * (self.total_turns - completed)
+
+    def dataframe(self):
+        """
+        The results analyzed so far as a DataFrame. Once the job is done, the same
+        frame (with its content hash already computed) is returned on every call;
+        it is shared, so callers must not modify it.
+        """
+        if self._final_df is not None:
+            return self._final_df
+        with self._lock:
+            return self._columns.to_dataframe()
+
+    def run(self, source: TranscriptSource, fmt: Optional[str] = None, **analysis_options: Any) -> None:
+        if self._cancel.is_set():
+            self.status = CANCELLED
+            self.finished_at = time.time()
+            return
+        self.status = RUNNING
+        self.started_at = time.time()
+        stage = 'parse'
+        try:
+            with recorder.stage('parse'):
+                self.timing = TranscriptTiming()
+                self.turns = list(iter_transcript_turns(source, fmt, timing=self.timing))
+            self.total_turns = len(self.turns)
+            stage = 'analysis'
+            for turn_chunk in iter_chunks(self.turns, self.chunk_size):
+                if self._cancel.is_set():
+                    self.status = CANCELLED
+                    break
+                turn_results = analyze_turn_results(turn_chunk, **analysis_options)
+                with self._lock:
+                    self._columns.extend(turn_chunk, turn_results)
+            else:
+                from summary_metrics import results_content_hash
+                final_df = self._columns.to_dataframe()
+                results_content_hash(final_df)
+                self._final_df = final_df
+                self.status = DONE
+        except Exception as e:
+            recorder.record_error(stage, e)
+            logger.exception("Analysis job %s failed", self.job_id)
+            self.error = f"Error {'parsing' if stage == 'parse' else 'analyzing'} transcript: {e}"
+            self.status = FAILED
+        finally:
+            self.finished_at = time.time()
+
+class JobManager:
+    """
+    Runs analysis jobs on a thread pool. Jobs are identified by a caller-chosen
+    ID (the app uses a hash of the transcript content), so every session asking
+    for the same transcript shares one job and its results. Up to max_jobs jobs
+    are kept; beyond that the oldest finished ones are forgotten.
+    """
+
+    def __init__(self, max_workers: int = ANALYSIS_JOB_WORKERS, max_jobs: int = ANALYSIS_JOB_MAX_JOBS,
+                 chunk_size: int = ANALYSIS_JOB_CHUNK_SIZE, **analysis_options: Any):
+        self.max_jobs = max_jobs
+        self.chunk_size = chunk_size
+        self.analysis_options = analysis_options
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis-job")
+        self._jobs: "OrderedDict[str, AnalysisJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def submit(self, job_id: str, source: TranscriptSource, restart: bool = False,
+               fmt: Optional[str] = None) -> AnalysisJob:
+        """
+        Returns the job for job_id, starting it on source (in format fmt, see
+        iter_transcript_turns) if there is none yet.
+        With restart=True, a cancelled or failed job is replaced by a new run.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and not (restart and job.status in (CANCELLED, FAILED)):
+                self._jobs.move_to_end(job_id)
+                return job
+            job = AnalysisJob(job_id, self.chunk_size)
+            self._jobs[job_id] = job
+            self._evict()
+        self._executor.submit(job.run, source, fmt, **self.analysis_options)
+        return job
+
+    def cancel(self, job_id: str) -> None:
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel()
+
+    def _evict(self) -> None:
+        excess = len(self._jobs) - self.max_jobs
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished][:max(excess, 0)]:
+            del self._jobs[job_id]
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for job in self._jobs.values():
+                job.cancel()
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,281 @@
+"""
+Local HTTP service for the analysis core.
+
+Endpoints (JSON in and out unless noted):
+    POST /analyze/text        {"text": "..."}                      -> {"result": {...}}
+    POST /analyze/texts       {"texts": ["...", ...]}              -> {"results": [{...}, ...]}
+    POST /analyze/turns       {"turns": [{"speaker": "...", "text": "..."}, ...]} -> {"turns": [row, ...]}
+    POST /analyze/transcript  raw transcript (text/plain) or {"transcript": "..."} -> {"turns": [row, ...]}
+    GET  /health              liveness
+    GET  /ready               200 once the models are loaded, 503 before
+    GET  /metrics             pipeline metrics in Prometheus text format
+
+Results have the keys 'label', 'score', 'count', 'total_words' and 'ratio'; turn
+rows use the same COL_* keys as the batch CLI output. Texts from concurrent
+requests are merged into shared model batches by a micro-batcher. Once more than
+SERVICE_MAX_PENDING_TEXTS texts are queued or in flight, requests are rejected
+with 503 and a Retry-After header.
+
+Usage:
+    python analysis_service.py --host 127.0.0.1 --port 8080
+"""
+import argparse
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Callable, Optional, Tuple
+from aiohttp import web
+from analysis_utils import Turn, iter_transcript_turns, iter_chunks, analyze_text_results, result_rows, \
+    load_sentiment_analyzer, load_spacy_model
+from instrumentation import recorder
+from constants import SERVICE_HOST, SERVICE_PORT, SERVICE_MAX_BATCH_TEXTS, SERVICE_MAX_WAIT_MS, \
+    SERVICE_MAX_PENDING_TEXTS, SERVICE_MAX_BODY_BYTES, ANALYSIS_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+class Overloaded(Exception):
+    """Raised when accepting a request would exceed the pending-text limit."""
+
+class MicroBatcher:
+    """
+    Merges the texts of concurrent requests into shared calls of process_batch.
+    A batch is closed once it holds max_batch_size texts or max_wait_ms after
+    its first request arrived, whichever comes first, and batches run one at a
+    time on a dedicated thread (requests arriving meanwhile form the next batch).
+    Requests are never split, so one request may exceed max_batch_size.
+    """
+
+    def __init__(self, process_batch: Callable[[List[str]], List[Dict[str, Any]]],
+                 max_batch_size: int = SERVICE_MAX_BATCH_TEXTS, max_wait_ms: float = SERVICE_MAX_WAIT_MS,
+                 max_pending: int = SERVICE_MAX_PENDING_TEXTS):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_pending = max_pending
+        self.pending = 0
+        self._queue: "asyncio.Queue[Tuple[List[str], asyncio.Future]]" = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="micro-batcher")
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=False)
+
+    async def submit(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Analyzes texts as part of the next batch. Raises Overloaded if the queue is full."""
+        if not texts:
+            return []
+        if self.pending + len(texts) > self.max_pending:
+            recorder.increment('service_rejected_requests')
+            raise Overloaded(f"{self.pending} texts pending")
+        self.pending += len(texts)
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((texts, future))
+        try:
+            return await future
+        finally:
+            self.pending -= len(texts)
+
+    async def _collect(self) -> List[Tuple[List[str], asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        size = len(batch[0][0])
+        deadline = loop.time() + self.max_wait
+        while size < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            texts = [text for request_texts, _ in batch for text in request_texts]
+            recorder.increment('service_batches')
+            recorder.increment('service_batch_texts', len(texts))
+            try:
+                results = await loop.run_in_executor(self._executor, self.process_batch, texts)
+            except Exception as e:
+                recorder.record_error('service', e)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            start = 0
+            for request_texts, future in batch:
+                if not future.done():
+                    future.set_result(results[start:start + len(request_texts)])
+                start += len(request_texts)
+
+def _json_error(status: int, message: str, retry_after: Optional[int] = None) -> web.Response:
+    headers = {'Retry-After': str(retry_after)} if retry_after is not None else None
+    return web.json_response({'error': message}, status=status, headers=headers)
+
+def _bad_request(message: str) -> web.HTTPBadRequest:
+    return web.HTTPBadRequest(text=json.dumps({'error': message}), content_type='application/json')
+
+async def _read_json(request: web.Request) -> Dict[str, Any]:
+    try:
+        body = await request.json()
+    except ValueError:
+        raise _bad_request("Request body must be JSON.")
+    if not isinstance(body, dict):
+        raise _bad_request("Request body must be a JSON object.")
+    return body
+
+def _string_list(value: Any, name: str) -> List[str]:
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise _bad_request(f"'{name}' must be a list of strings.")
+    return value
+
+class AnalysisService:
+    """The aiohttp application: request handlers around a shared MicroBatcher."""
+
+    def __init__(self, cache: Any = None, **batcher_options: Any):
+        self.cache = cache
+        self.batcher_options = batcher_options
+        self.batcher: Optional[MicroBatcher] = None
+        self.ready = False
+
+    def _process_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        with recorder.stage('service_batch'):
+            return analyze_text_results(texts, cache=self.cache)
+
+    @web.middleware
+    async def _guard(self, request: web.Request, handler):
+        if request.path.startswith('/analyze'):
+            if not self.ready:
+                return _json_error(503, "Models are still loading.", retry_after=5)
+            try:
+                with recorder.stage('service_request'):
+                    return await handler(request)
+            except Overloaded:
+                return _json_error(503, "Service overloaded, retry later.", retry_after=1)
+        return await handler(request)
+
+    async def analyze_text(self, request: web.Request) -> web.Response:
+        text = (await _read_json(request)).get('text')
+        if not isinstance(text, str):
+            return _json_error(400, "'text' must be a string.")
+        return web.json_response({'result': (await self.batcher.submit([text]))[0]})
+
+    async def analyze_texts(self, request: web.Request) -> web.Response:
+        texts = _string_list((await _read_json(request)).get('texts'), 'texts')
+        if len(texts) > self.batcher.max_pending:
+            return _json_error(413, f"At most {self.batcher.max_pending} texts per request.")
+        return web.json_response({'results': await self.batcher.submit(texts)})
+
+    async def analyze_turns(self, request: web.Request) -> web.Response:
+        raw_turns = (await _read_json(request)).get('turns')
+        if not isinstance(raw_turns, list) or not all(
+                isinstance(turn, dict) and isinstance(turn.get('speaker'), str) and isinstance(turn.get('text'), str)
+                for turn in raw_turns):
+            return _json_error(400, "'turns' must be a list of objects with string 'speaker' and 'text'.")
+        if len(raw_turns) > self.batcher.max_pending:
+            return _json_error(413, f"At most {self.batcher.max_pending} turns per request.")
+        turns = [Turn(i, turn['speaker'], turn['text']) for i, turn in enumerate(raw_turns, 1)]
+        results = await self.batcher.submit([turn.text for turn in turns])
+        return web.json_response({'turns': result_rows(turns, results)})
+
+    async def analyze_transcript(self, request: web.Request) -> web.Response:
+        if request.content_type == 'application/json':
+            transcript = (await _read_json(request)).get('transcript')
+            if not isinstance(transcript, str):
+                return _json_error(400, "'transcript' must be a string.")
+            data = transcript.encode('utf-8')
+        else:
+            data = await request.read()
+        try:
+            turns = await asyncio.get_running_loop().run_in_executor(None, lambda: list(iter_transcript_turns(data)))
+        except UnicodeDecodeError:
+            return _json_error(400, "Transcript must be UTF-8 encoded.")
+        except ValueError as e:
+            return _json_error(400, f"Malformed transcript: {e}")
+        rows = []
+        for turn_chunk in iter_chunks(turns, min(ANALYSIS_CHUNK_SIZE, self.batcher.max_pending)):
+            rows.extend(result_rows(turn_chunk, await self.batcher.submit([turn.text for turn in turn_chunk])))
+        return web.json_response({'turns': rows})
+
+    async def health(self, request: web.Request) -> web.Response:
+        return web.json_response({'status': 'ok'})
+
+    async def readiness(self, request: web.Request) -> web.Response:
+        pending = self.batcher.pending if self.batcher is not None else 0
+        return web.json_response({'ready': self.ready, 'pending_texts': pending}, status=200 if self.ready else 503)
+
+    async def metrics(self, request: web.Request) -> web.Response:
+        return web.Response(text=recorder.to_prometheus(), content_type='text/plain')
+
+    async def _load_models(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, load_sentiment_analyzer)
+            await loop.run_in_executor(None, load_spacy_model)
+        except Exception as e:
+            recorder.record_error('model_load', e)
+            logger.exception("Loading the models failed; the service stays unready.")
+            return
+        self.ready = True
+        logger.info("Models loaded; service ready.")
+
+    async def _on_startup(self, app: web.Application) -> None:
+        self.batcher = MicroBatcher(self._process_batch, **self.batcher_options)
+        self.batcher.start()
+        app['model_loader'] = asyncio.get_running_loop().create_task(self._load_models())
+
+    async def _on_cleanup(self, app: web.Application) -> None:
+        app['model_loader'].cancel()
+        await self.batcher.stop()
+
+    def make_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._guard], client_max_size=SERVICE_MAX_BODY_BYTES)
+        app.add_routes([
+            web.post('/analyze/text', self.analyze_text),
+            web.post('/analyze/texts', self.analyze_texts),
+            web.post('/analyze/turns', self.analyze_turns),
+            web.post('/analyze/transcript', self.analyze_transcript),
+            web.get('/health', self.health),
+            web.get('/ready', self.readiness),
+            web.get('/metrics', self.metrics),
+        ])
+        app.on_startup.append(self._on_startup)
+        app.on_cleanup.append(self._on_cleanup)
+        return app
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--max-batch-size", type=int, default=SERVICE_MAX_BATCH_TEXTS)
+    parser.add_argument("--max-wait-ms", type=float, default=SERVICE_MAX_WAIT_MS)
+    parser.add_argument("--max-pending", type=int, default=SERVICE_MAX_PENDING_TEXTS)
+    parser.add_argument("--no-cache", action='store_true', help="Do not use the persistent analysis cache.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    cache = None
+    if not args.no_cache:
+        from analysis_cache import AnalysisCache
+        cache = AnalysisCache()
+    service = AnalysisService(cache=cache, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms,
+                              max_pending=args.max_pending)
+    web.run_app(service.make_app(), host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,98 @@
+import hashlib
+import io
+import logging
+import os
 import re
-import spacy
-from transformers import pipeline
-import streamlit as st
-from typing import List, Dict, Any
-from constants import FILLER_WORDS, SENTIMENT_MODEL_NAME, SPACY_MODEL_NAME, \
-    COL_TURN_NUM, COL_SPEAKER, COL_DIALOGUE, COL_SENTIMENT_LABEL, COL_SENTIMENT_SCORE, COL_FILLER_COUNT, COL_TOTAL_WORDS, COL_FILLER_RATIO
-
-@st.cache_resource
-def load_sentiment_analyzer():
-    """Loads and caches the Hugging Face sentiment analysis pipeline."""
-    return pipeline(task="sentiment-analysis", model=SENTIMENT_MODEL_NAME)
-
-@st.cache_resource
+import sys
+import threading
+import time
+from itertools import chain, islice
+from typing import List, Dict, Any, Optional, Iterable, Iterator, TextIO, Tuple, Union, Callable
+from filler_matcher import count_filler_words
+from analysis_cache import AnalysisCache
+from instrumentation import recorder
+from constants import SPACY_MODEL_NAME, SENTIMENT_INTRA_OP_THREADS, SENTIMENT_BATCH_SIZE, \
+    SENTIMENT_MAX_TOKENS, SENTIMENT_WINDOW_OVERLAP, \
+    SPACY_BATCH_SIZE, SPACY_N_PROCESS, ANALYSIS_CHUNK_SIZE, \
+    COL_TURN_NUM, COL_SPEAKER, COL_DIALOGUE, COL_SENTIMENT_LABEL, COL_SENTIMENT_SCORE, COL_FILLER_COUNT, COL_TOTAL_WORDS, COL_FILLER_RATIO, \
+    COL_SENTENCE_NUM, COL_SENTENCE
+
+logger = logging.getLogger(__name__)
+
+# Models are loaded on first use (not at import) and shared by all threads of the process.
+_sentiment_analyzer = None
+_nlp = None
+_sentencizer = None
+_sentiment_lock = threading.Lock()
+_spacy_lock = threading.Lock()
+
+def load_sentiment_analyzer(intra_op_threads: int = SENTIMENT_INTRA_OP_THREADS):
+    """
+    Loads and caches the sentiment analysis pipeline on the backend configured by
+    SENTIMENT_BACKEND (see sentiment_backends). intra_op_threads only takes effect
+    on the first call, which loads the model.
+    """
+    global _sentiment_analyzer
+    if _sentiment_analyzer is None:
+        with _sentiment_lock:
+            if _sentiment_analyzer is None:
+                start = time.perf_counter()
+                from sentiment_backends import load_sentiment_pipeline
+                _sentiment_analyzer = load_sentiment_pipeline(intra_op_threads=intra_op_threads)
+                recorder.record_model_load('sentiment', time.perf_counter() - start)
+    return _sentiment_analyzer
+
 def load_spacy_model():
     """Loads and caches the spaCy NLP model."""
-    return spacy.load(SPACY_MODEL_NAME)
+    global _nlp
+    if _nlp is None:
+        with _spacy_lock:
+            if _nlp is None:
+                start = time.perf_counter()
+                import spacy
+                _nlp = spacy.load(SPACY_MODEL_NAME)
+                recorder.record_model_load('spacy', time.perf_counter() - start)
+    return _nlp
 
-sentiment_analyzer = load_sentiment_analyzer()
-nlp = load_spacy_model()
+# Rule-based sentence splitting, used when the spaCy model is not a real Language (e.g. benchmark stubs).
+SENTENCE_RE = re.compile(r"[^.!?]+(?:[.!?]+[\"')\]]*|$)|[.!?]+")
+
+def load_sentencizer():
+    """
+    Loads and caches a rule-based spaCy sentencizer: a blank pipeline in the
+    language of the spaCy model, sharing its vocab, with only the 'sentencizer'
+    component (much faster than sentence boundaries from the dependency parse).
+    Returns None if the loaded spaCy model is not a spaCy Language.
+    """
+    global _sentencizer
+    if _sentencizer is None:
+        nlp = load_spacy_model()
+        with _spacy_lock:
+            if _sentencizer is None:
+                if not hasattr(nlp, 'vocab'):
+                    return None
+                import spacy
+                sentencizer = spacy.blank(nlp.lang, vocab=nlp.vocab)
+                sentencizer.add_pipe('sentencizer')
+                _sentencizer = sentencizer
+    return _sentencizer
+
+def set_model_backends(sentiment_analyzer: Any = None, nlp: Any = None) -> None:
+    """
+    Overrides the lazily loaded models, e.g. with deterministic stubs for offline
+    benchmarks. Objects must follow the transformers pipeline / spaCy Language
+    interfaces used here; passing None leaves that model unchanged. A custom
+    sentiment model is recorded as the 'custom' backend, so analysis caches do
+    not mix its results with those of the real models.
+    """
+    global _sentiment_analyzer, _nlp, _sentencizer
+    if sentiment_analyzer is not None:
+        from sentiment_backends import set_loaded_sentiment_backend_id
+        _sentiment_analyzer = sentiment_analyzer
+        set_loaded_sentiment_backend_id('custom')
+    if nlp is not None:
+        _nlp = nlp
+        _sentencizer = None
 
 def map_sentiment_label(raw_label: str) -> str:
     label_map = {
@@ -30,71 +105,392 @@ def map_sentiment_label(raw_label: str) -> str:
     }
     return label_map.get(raw_label.upper(), raw_label)
 
-def parse_transcript(file_path: str) -> List[Dict[str, Any]]:
+SPEAKER_LINE_RE = re.compile(r"^(Speaker [A-Za-z0-9]+):(.*)")
+
+class Turn:
+    """
+    One parsed dialogue turn. Uses __slots__ (no per-instance dict) and interned
+    speaker names, so long transcripts keep only the turn text itself.
+    start and end are in seconds for timed transcripts (SRT, WebVTT, JSON) and
+    None for 'Speaker X:' text transcripts.
+    """
+    __slots__ = ('id', 'speaker', 'text', 'start', 'end')
+
+    def __init__(self, id: int, speaker: str, text: str, start: Optional[float] = None, end: Optional[float] = None):
+        self.id = id
+        self.speaker = sys.intern(speaker)
+        self.text = text
+        self.start = start
+        self.end = end
+
+    def __repr__(self) -> str:
+        times = f", start={self.start!r}, end={self.end!r}" if self.start is not None or self.end is not None else ""
+        return f"Turn(id={self.id!r}, speaker={self.speaker!r}, text={self.text!r}{times})"
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Turn):
+            return NotImplemented
+        return (self.id, self.speaker, self.text, self.start, self.end) == \
+            (other.id, other.speaker, other.text, other.start, other.end)
+
+class TurnAssembler:
+    """
+    Assembles transcript lines into dialogue turns one line at a time.
+    The assembler holds the currently open turn, so parsing can stop after any
+    line and resume later with more input.
+    """
+
+    def __init__(self):
+        self.current_speaker = None
+        self.current_text_lines = []
+        self.turn_counter = 0
+
+    def _make_turn(self) -> Turn:
+        return Turn(self.turn_counter + 1, self.current_speaker, ' '.join(self.current_text_lines).strip())
+
+    def feed(self, line: str) -> Optional[Turn]:
+        """Consumes one line; returns the previous turn if this line starts a new one."""
+        stripped_line = line.strip()
+        if not stripped_line:
+            return None
+        match = SPEAKER_LINE_RE.match(stripped_line)
+        completed = None
+        if match:
+            if self.current_speaker and self.current_text_lines:
+                completed = self._make_turn()
+                self.turn_counter += 1
+            self.current_speaker = match.group(1).strip()
+            self.current_text_lines = [match.group(2).strip()]
+        elif self.current_speaker:
+            self.current_text_lines.append(stripped_line)
+        return completed
+
+    def open_turn(self) -> Optional[Turn]:
+        """Returns the turn that is still open (it may grow with more lines), if any."""
+        if self.current_speaker and self.current_text_lines:
+            return self._make_turn()
+        return None
+
+    def flush(self) -> Optional[Turn]:
+        """Closes and returns the open turn at the end of the input."""
+        turn = self.open_turn()
+        if turn is not None:
+            self.turn_counter += 1
+            self.current_speaker = None
+            self.current_text_lines = []
+        return turn
+
+    def copy(self) -> 'TurnAssembler':
+        clone = TurnAssembler()
+        clone.current_speaker = self.current_speaker
+        clone.current_text_lines = list(self.current_text_lines)
+        clone.turn_counter = self.turn_counter
+        return clone
+
+def _iter_turns_from_lines(lines: Iterable[str]) -> Iterator[Turn]:
+    assembler = TurnAssembler()
+    for line in lines:
+        turn = assembler.feed(line)
+        if turn is not None:
+            yield turn
+    turn = assembler.flush()
+    if turn is not None:
+        yield turn
+
+TranscriptSource = Union[str, os.PathLike, bytes, TextIO]
+
+def transcript_content_hash(data: bytes) -> str:
+    """Identity of a transcript's content (used to key caches, jobs and the corpus store)."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def transcript_file_hash(path: Union[str, os.PathLike], block_size: int = 1 << 20) -> str:
+    """transcript_content_hash of a file's bytes, hashed block by block instead of reading the whole file."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _iter_turns_in_format(lines: Iterable[str], fmt: Optional[str], timing: Any) -> Iterator[Turn]:
+    from transcript_formats import SPEAKER_LINES_FORMAT, detect_format, iter_timed_turns
+    if fmt is None:
+        lines = iter(lines)
+        head = []
+        for line in lines:
+            head.append(line)
+            if line.strip():
+                break
+        fmt = detect_format(head[-1] if head else '')
+        lines = chain(head, lines)
+    if fmt == SPEAKER_LINES_FORMAT:
+        yield from _iter_turns_from_lines(lines)
+    else:
+        yield from iter_timed_turns(lines, fmt, timing)
+
+def _iter_source_turns(source: TranscriptSource, fmt: Optional[str], timing: Any) -> Iterator[Turn]:
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'r', encoding='utf-8-sig') as file:
+            yield from _iter_turns_in_format(file, fmt, timing)
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        with io.TextIOWrapper(io.BytesIO(source), encoding='utf-8-sig') as file:
+            yield from _iter_turns_in_format(file, fmt, timing)
+    else:
+        yield from _iter_turns_in_format(source, fmt, timing)
+
+def _sniff_format(source: TranscriptSource) -> Optional[str]:
+    """
+    Detects the format of a path, bytes or seekable text file from its first
+    non-blank line, read with readline and rewound, so parsers still get the
+    file itself and can read it in blocks. None for other sources.
     """
-    Loads and parses the transcript file into a list of dialogue turns.
-    Each turn is a dictionary with 'speaker' and 'text'.
+    from transcript_formats import detect_format
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'r', encoding='utf-8-sig') as file:
+            return _sniff_format(file)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        with io.TextIOWrapper(io.BytesIO(source), encoding='utf-8-sig') as file:
+            return _sniff_format(file)
+    if not getattr(source, 'seekable', lambda: False)():
+        return None
+    start = source.tell()
+    line = source.readline()
+    while line and not line.strip():
+        line = source.readline()
+    source.seek(start)
+    return detect_format(line)
+
+def iter_transcript_turns(source: TranscriptSource, fmt: Optional[str] = None, timing: Any = None) -> Iterator[Turn]:
+    """
+    Lazily parses a transcript (a file path, UTF-8 encoded bytes such as an
+    upload, or an open text file), yielding one turn at a time. The input is
+    decoded line by line, so memory use is bounded by the longest turn rather
+    than by the file size; bytes are read in place, not decoded into one string.
+
+    Besides 'Speaker X:' lines, timed SRT, WebVTT, JSON and JSON Lines
+    transcripts are read (see transcript_formats). fmt names the format;
+    by default it follows a path's extension (.txt is 'Speaker X:' lines) and
+    is only detected from the first non-blank line for sources without a known
+    extension. If a detected timed format fails to parse before yielding any
+    turn, or yields no turns at all, the transcript is read as 'Speaker X:'
+    lines instead (open text files only if they are seekable). For timed formats, consecutive segments of one
+    speaker are merged into a turn, and a transcript_formats.TranscriptTiming
+    passed as timing accumulates talk-time metrics during the same pass.
     """
-    turns = []
+    from transcript_formats import SPEAKER_LINES_FORMAT, format_from_path
+    if fmt is None and isinstance(source, (str, os.PathLike)):
+        fmt = format_from_path(source)
+    if fmt is not None:
+        yield from _iter_source_turns(source, fmt, timing)
+        return
+    fmt = _sniff_format(source)
+    if fmt is None or fmt == SPEAKER_LINES_FORMAT:
+        yield from _iter_source_turns(source, fmt, timing)
+        return
+    start = None if isinstance(source, (str, os.PathLike, bytes, bytearray, memoryview)) else source.tell()
+    parsed = 0
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            content = file.read()
-        current_speaker = None
-        current_text_lines = []
-        turn_counter = 0
-        for line in content.split('\n'):
-            stripped_line = line.strip()
-            if not stripped_line:
-                continue
-            match = re.match(r"^(Speaker [A-Za-z0-9]+):(.*)", stripped_line)
-            if match:
-                if current_speaker and current_text_lines:
-                    turn_counter += 1
-                    turns.append({
-                        'id': turn_counter,
-                        'speaker': current_speaker,
-                        'text': ' '.join(current_text_lines).strip()
-                    })
-                current_speaker = match.group(1).strip()
-                current_text_lines = [match.group(2).strip()]
-            elif current_speaker:
-                current_text_lines.append(stripped_line)
-        if current_speaker and current_text_lines:
-            turn_counter += 1
-            turns.append({
-                'id': turn_counter,
-                'speaker': current_speaker,
-                'text': ' '.join(current_text_lines).strip()
-            })
-    except FileNotFoundError:
-        st.error(f"Error: Transcript file '{file_path}' not found.")
+        for turn in _iter_source_turns(source, fmt, timing):
+            parsed += 1
+            yield turn
+    except UnicodeDecodeError:
+        raise
+    except ValueError as e:
+        if parsed:
+            raise
+        recorder.record_error('parse_format', e)
+        logger.warning("Transcript did not parse as %s (%s); reading it as 'Speaker X:' lines.", fmt, e)
+    else:
+        if parsed:
+            return
+        logger.warning("Transcript detected as %s has no turns in that format; reading it as 'Speaker X:' lines.", fmt)
+    if timing is not None:
+        timing.reset()
+    if start is not None:
+        source.seek(start)
+    yield from _iter_source_turns(source, SPEAKER_LINES_FORMAT, timing)
+
+def parse_transcript(file_path: TranscriptSource, on_error: Callable[[str], Any] = logger.error) -> List[Turn]:
+    """
+    Loads and parses the transcript (see iter_transcript_turns for the accepted
+    sources) into a list of dialogue turns (Turn records with id, speaker and text).
+    Errors are reported through on_error and result in an empty list.
+    """
+    try:
+        with recorder.stage('parse'):
+            return list(iter_transcript_turns(file_path))
+    except FileNotFoundError as e:
+        recorder.record_error('parse', e)
+        on_error(f"Error: Transcript file '{file_path}' not found.")
         return []
     except Exception as e:
-        st.error(f"Error parsing transcript: {e}")
+        recorder.record_error('parse', e)
+        on_error(f"Error parsing transcript: {e}")
         return []
-    return turns
+
+def iter_chunks(items: Iterable[Any], chunk_size: int) -> Iterator[List[Any]]:
+    """Groups an iterable into lists of at most chunk_size items."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def _format_sentiment(result: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if result is None:
+        return {'label': 'ERROR', 'score': 0.0}
+    return {
+        'label': map_sentiment_label(result['label']),
+        'score': round(float(result['score']), 4)
+    }
 
 def calculate_sentiment(text: str) -> Dict[str, Any]:
     if not text:
         return {'label': 'NEUTRAL', 'score': 0.0}
+    return calculate_sentiment_batch([text])[0]
+
+def _window_token_limit(tokenizer) -> int:
+    model_limit = min(SENTIMENT_MAX_TOKENS, getattr(tokenizer, 'model_max_length', SENTIMENT_MAX_TOKENS))
+    return model_limit - tokenizer.num_special_tokens_to_add()
+
+def split_sentiment_windows(texts: List[str], max_tokens: Optional[int] = None,
+                            overlap: int = SENTIMENT_WINDOW_OVERLAP) -> List[List[Tuple[str, int]]]:
+    """
+    Splits each text into overlapping windows that fit the sentiment model.
+    Returns, per text, a list of (window_text, token_count) pairs; texts within
+    the limit yield a single window containing the whole text.
+    """
+    tokenizer = load_sentiment_analyzer().tokenizer
+    if max_tokens is None:
+        max_tokens = _window_token_limit(tokenizer)
+    stride = max(1, max_tokens - overlap)
     try:
-        result = sentiment_analyzer(text)[0]
-        return {
-            'label': map_sentiment_label(result['label']),
-            'score': round(float(result['score']), 4)
-        }
-    except Exception:
-        return {'label': 'ERROR', 'score': 0.0}
+        encodings = tokenizer(texts, add_special_tokens=False, return_offsets_mapping=True)['offset_mapping']
+    except Exception as e:
+        recorder.record_error('sentiment_windows', e)
+        # Slow tokenizers have no offset mapping; the pipeline truncates instead.
+        return [[(text, len(text.split()))] for text in texts]
+    windows = []
+    for text, offsets in zip(texts, encodings):
+        num_tokens = len(offsets)
+        if num_tokens <= max_tokens:
+            windows.append([(text, max(num_tokens, 1))])
+            continue
+        text_windows = []
+        for start in range(0, num_tokens, stride):
+            end = min(start + max_tokens, num_tokens)
+            text_windows.append((text[offsets[start][0]:offsets[end - 1][1]], end - start))
+            if end == num_tokens:
+                break
+        windows.append(text_windows)
+    return windows
 
-def calculate_filler_word_stats(text: str) -> Dict[str, Any]:
-    if not text:
-        return {'count': 0, 'total_words': 0, 'ratio': 0.0}
-    doc = nlp(text)
-    total_words = len([token for token in doc if not token.is_punct and not token.is_space])
-    filler_count = 0
-    text_lower = text.lower()
-    for filler in FILLER_WORDS:
-        filler_count += len(re.findall(r'\b' + re.escape(filler) + r'\b', text_lower))
+def _run_sentiment_batch(texts: List[str], batch_size: int) -> List[Optional[List[Dict[str, Any]]]]:
+    """
+    Runs one batch through the pipeline, returning the scores of all labels per text.
+    If the batch fails, its items are retried one by one so that only the
+    offending item ends up as None.
+    """
+    sentiment_analyzer = load_sentiment_analyzer()
+    try:
+        return sentiment_analyzer(texts, batch_size=batch_size, top_k=None, truncation=True)
+    except Exception as e:
+        recorder.record_error('sentiment_batch', e)
+        outputs = []
+        for text in texts:
+            try:
+                outputs.append(sentiment_analyzer([text], top_k=None, truncation=True)[0])
+            except Exception as item_error:
+                recorder.record_error('sentiment', item_error)
+                outputs.append(None)
+        return outputs
+
+def calculate_sentiment_batch(texts: List[str], batch_size: int = SENTIMENT_BATCH_SIZE) -> List[Dict[str, Any]]:
+    """
+    Batched equivalent of calculate_sentiment. Long texts are split into
+    overlapping token windows; the windows of all texts are sorted by length and
+    scored in shared batches to keep padding low. Window label probabilities are
+    averaged per text, weighted by window length, and results are returned in
+    input order.
+    """
+    results = [{'label': 'NEUTRAL', 'score': 0.0} for _ in texts]
+    indices = [i for i, text in enumerate(texts) if text]
+    if not indices:
+        return results
+    window_texts, owners, weights = [], [], []
+    for i, text_windows in zip(indices, split_sentiment_windows([texts[i] for i in indices])):
+        for window_text, num_tokens in text_windows:
+            window_texts.append(window_text)
+            owners.append(i)
+            weights.append(num_tokens)
+
+    order = sorted(range(len(window_texts)), key=lambda w: weights[w])
+    window_scores: List[Optional[List[Dict[str, Any]]]] = [None] * len(window_texts)
+    for start in range(0, len(order), batch_size):
+        batch = order[start:start + batch_size]
+        for w, output in zip(batch, _run_sentiment_batch([window_texts[w] for w in batch], batch_size)):
+            window_scores[w] = output
+
+    label_totals: Dict[int, Dict[str, float]] = {}
+    weight_totals: Dict[int, int] = {}
+    failed = set()
+    for w, output in enumerate(window_scores):
+        i = owners[w]
+        if output is None:
+            failed.add(i)
+            continue
+        totals = label_totals.setdefault(i, {})
+        for item in output:
+            totals[item['label']] = totals.get(item['label'], 0.0) + item['score'] * weights[w]
+        weight_totals[i] = weight_totals.get(i, 0) + weights[w]
+    for i in indices:
+        if i in failed or i not in label_totals:
+            results[i] = _format_sentiment(None)
+            continue
+        totals = label_totals[i]
+        label = max(totals, key=totals.get)
+        results[i] = _format_sentiment({'label': label, 'score': totals[label] / weight_totals[i]})
+    return results
+
+def split_sentences(texts: List[str], batch_size: int = SPACY_BATCH_SIZE) -> List[List[Tuple[int, int]]]:
+    """
+    Splits each text into sentences, returned as (start, end) character offsets
+    with surrounding whitespace excluded. Uses load_sentencizer via nlp.pipe, or
+    SENTENCE_RE if no spaCy Language is loaded.
+    """
+    sentencizer = load_sentencizer()
+    spans = []
+    if sentencizer is not None:
+        for doc in sentencizer.pipe(texts, batch_size=batch_size):
+            spans.append([(sent.start_char, sent.end_char) for sent in doc.sents if sent.text.strip()])
+        return spans
+    for text in texts:
+        text_spans = []
+        for match in SENTENCE_RE.finditer(text):
+            start, end = match.span()
+            sentence = match.group(0)
+            start += len(sentence) - len(sentence.lstrip())
+            end -= len(sentence) - len(sentence.rstrip())
+            if start < end:
+                text_spans.append((start, end))
+        spans.append(text_spans)
+    return spans
+
+def _count_words(doc) -> int:
+    return len([token for token in doc if not token.is_punct and not token.is_space])
+
+def count_words_batch(texts: List[str], batch_size: int = SPACY_BATCH_SIZE,
+                      n_process: int = SPACY_N_PROCESS) -> List[int]:
+    """
+    Counts non-punctuation, non-space tokens for many texts via nlp.pipe.
+    All pipeline components are disabled: is_punct and is_space are lexical
+    attributes, so the tokenizer alone gives the same counts as the full model.
+    """
+    nlp = load_spacy_model()
+    docs = nlp.pipe(texts, batch_size=batch_size, n_process=n_process, disable=nlp.pipe_names)
+    return [_count_words(doc) for doc in docs]
+
+def _filler_stats(filler_count: int, total_words: int) -> Dict[str, Any]:
     ratio = (filler_count / total_words) if total_words > 0 else 0.0
     return {
         'count': filler_count,
@@ -102,26 +498,152 @@ def calculate_filler_word_stats(text: str) -> Dict[str, Any]:
         'ratio': round(ratio, 4)
     }
 
-def analyze_transcript_data(transcript_file_path: str = 'transcript.txt') -> list:
-    dialogue_turns = parse_transcript(transcript_file_path)
-    analysis_results = []
-    if not dialogue_turns:
-        return analysis_results
-    for turn_data in dialogue_turns:
-        text = turn_data['text']
-        sentiment_data = calculate_sentiment(text)
-        filler_stats = calculate_filler_word_stats(text)
-        analysis_results.append({
-            COL_TURN_NUM: turn_data['id'],
-            COL_SPEAKER: turn_data['speaker'],
-            COL_DIALOGUE: text,
-            COL_SENTIMENT_LABEL: sentiment_data['label'],
-            COL_SENTIMENT_SCORE: sentiment_data['score'],
-            COL_FILLER_COUNT: filler_stats['count'],
-            COL_TOTAL_WORDS: filler_stats['total_words'],
-            COL_FILLER_RATIO: filler_stats['ratio']
-        })
-    return analysis_results
+def calculate_filler_word_stats(text: str) -> Dict[str, Any]:
+    if not text:
+        return {'count': 0, 'total_words': 0, 'ratio': 0.0}
+    return _filler_stats(count_filler_words(text), _count_words(load_spacy_model().make_doc(text)))
+
+def calculate_filler_word_stats_batch(texts: List[str], batch_size: int = SPACY_BATCH_SIZE,
+                                      n_process: int = SPACY_N_PROCESS) -> List[Dict[str, Any]]:
+    """Batched equivalent of calculate_filler_word_stats; results are in input order."""
+    with recorder.stage('spacy'):
+        word_counts = count_words_batch(texts, batch_size, n_process)
+    with recorder.stage('filler'):
+        return [
+            _filler_stats(count_filler_words(text), total_words) if text else {'count': 0, 'total_words': 0, 'ratio': 0.0}
+            for text, total_words in zip(texts, word_counts)
+        ]
+
+def _analyze_texts(texts: List[str], sentiment_batch_size: int, spacy_batch_size: int,
+                   spacy_n_process: int) -> List[Dict[str, Any]]:
+    with recorder.stage('sentiment'):
+        sentiments = calculate_sentiment_batch(texts, sentiment_batch_size)
+    filler_stats_list = calculate_filler_word_stats_batch(texts, spacy_batch_size, spacy_n_process)
+    return [{**sentiment_data, **filler_stats} for sentiment_data, filler_stats in zip(sentiments, filler_stats_list)]
+
+def analyze_text_results(texts: List[str],
+                         sentiment_batch_size: int = SENTIMENT_BATCH_SIZE,
+                         spacy_batch_size: int = SPACY_BATCH_SIZE,
+                         spacy_n_process: int = SPACY_N_PROCESS,
+                         cache: Optional[AnalysisCache] = None) -> List[Dict[str, Any]]:
+    """
+    Analyzes a list of texts, returning per text a dictionary with
+    'label', 'score', 'count', 'total_words' and 'ratio'.
+    With a cache, only texts that have not been analyzed before go through the models.
+    """
+    if cache is not None:
+        with recorder.stage('cache'):
+            text_results = cache.get_many(texts)
+    else:
+        text_results = [None] * len(texts)
+    missing = [i for i, result in enumerate(text_results) if result is None]
+    if cache is not None:
+        recorder.increment('cache_hits', len(texts) - len(missing))
+        recorder.increment('cache_misses', len(missing))
+    if missing:
+        missing_texts = [texts[i] for i in missing]
+        computed = _analyze_texts(missing_texts, sentiment_batch_size, spacy_batch_size, spacy_n_process)
+        for i, result in zip(missing, computed):
+            text_results[i] = result
+        if cache is not None:
+            with recorder.stage('cache'):
+                cache.put_many(missing_texts, computed)
+    return text_results
+
+def analyze_turn_results(dialogue_turns: List[Turn], **analysis_options: Any) -> List[Dict[str, Any]]:
+    """
+    Analyzes a list of parsed turns, returning per turn a dictionary with
+    'label', 'score', 'count', 'total_words' and 'ratio' (see analyze_text_results
+    for the options).
+    """
+    start = time.perf_counter()
+    turn_results = analyze_text_results([turn.text for turn in dialogue_turns], **analysis_options)
+    if dialogue_turns:
+        # Turns are analyzed in batches, so each turn is observed with its chunk's mean time per turn.
+        recorder.observe('chunk_turn_latency_seconds', (time.perf_counter() - start) / len(dialogue_turns), len(dialogue_turns))
+    recorder.increment('turns_analyzed', len(dialogue_turns))
+    return turn_results
+
+def result_rows(dialogue_turns: List[Turn], turn_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Combines turns and their analysis results into result rows keyed by the COL_* column names."""
+    return [
+        {
+            COL_TURN_NUM: turn.id,
+            COL_SPEAKER: turn.speaker,
+            COL_DIALOGUE: turn.text,
+            COL_SENTIMENT_LABEL: result['label'],
+            COL_SENTIMENT_SCORE: result['score'],
+            COL_FILLER_COUNT: result['count'],
+            COL_TOTAL_WORDS: result['total_words'],
+            COL_FILLER_RATIO: result['ratio']
+        }
+        for turn, result in zip(dialogue_turns, turn_results)
+    ]
+
+def analyze_turns(dialogue_turns: List[Turn], **analysis_options: Any) -> List[Dict[str, Any]]:
+    """Analyzes a list of parsed turns, returning one result row per turn."""
+    return result_rows(dialogue_turns, analyze_turn_results(dialogue_turns, **analysis_options))
+
+def iter_analyzed_chunks(source: TranscriptSource,
+                         chunk_size: int = ANALYSIS_CHUNK_SIZE,
+                         timing: Any = None,
+                         fmt: Optional[str] = None,
+                         **analysis_options: Any) -> Iterator[Tuple[List[Turn], List[Dict[str, Any]]]]:
+    """
+    Streams a transcript through the analysis stages in chunks of at most
+    chunk_size turns, yielding (turns, turn_results) for each chunk as it completes.
+    fmt and timing are passed on to iter_transcript_turns.
+    """
+    turn_chunks = iter_chunks(iter_transcript_turns(source, fmt, timing), chunk_size)
+    while True:
+        with recorder.stage('parse'):
+            turn_chunk = next(turn_chunks, None)
+        if turn_chunk is None:
+            return
+        yield turn_chunk, analyze_turn_results(turn_chunk, **analysis_options)
+
+def iter_analysis_results(source: TranscriptSource,
+                          chunk_size: int = ANALYSIS_CHUNK_SIZE,
+                          timing: Any = None,
+                          fmt: Optional[str] = None,
+                          **analysis_options: Any) -> Iterator[List[Dict[str, Any]]]:
+    """Like iter_analyzed_chunks, but yields the result rows of each chunk."""
+    for turn_chunk, turn_results in iter_analyzed_chunks(source, chunk_size, timing, fmt, **analysis_options):
+        yield result_rows(turn_chunk, turn_results)
+
+def analyze_transcript_columns(source: TranscriptSource,
+                               chunk_size: int = ANALYSIS_CHUNK_SIZE,
+                               **analysis_options: Any):
+    """Analyzes a whole transcript into a typed AnalysisColumns store."""
+    from result_columns import AnalysisColumns
+    columns = AnalysisColumns()
+    for turn_chunk, turn_results in iter_analyzed_chunks(source, chunk_size, **analysis_options):
+        columns.extend(turn_chunk, turn_results)
+    return columns
+
+def analyze_transcript_data(transcript_file_path: TranscriptSource = 'transcript.txt',
+                            chunk_size: int = ANALYSIS_CHUNK_SIZE,
+                            on_error: Callable[[str], Any] = logger.error,
+                            **analysis_options: Any):
+    """
+    Analyzes a transcript file (or any source accepted by iter_transcript_turns)
+    into a results DataFrame (one row per turn, COL_* columns).
+    Errors are reported through on_error and result in an empty DataFrame.
+    """
+    try:
+        columns = analyze_transcript_columns(transcript_file_path, chunk_size, **analysis_options)
+    except FileNotFoundError as e:
+        recorder.record_error('parse', e)
+        on_error(f"Error: Transcript file '{transcript_file_path}' not found.")
+        columns = None
+    except Exception as e:
+        recorder.record_error('analysis', e)
+        on_error(f"Error analyzing transcript: {e}")
+        columns = None
+    if columns is None:
+        from result_columns import AnalysisColumns
+        columns = AnalysisColumns()
+    return columns.to_dataframe()
 
 if __name__ == "__main__":
     print("--- Sentiment Analysis Test Cases ---")
@@ -139,6 +661,16 @@ if __name__ == "__main__":
     for text in test_texts:
         result = calculate_sentiment(text)
         print(f"Text: '{text}' => Sentiment: {result['label']}, Score: {result['score']}")
+    batched = calculate_sentiment_batch(test_texts)
+    mismatches = [text for text, b in zip(test_texts, batched) if b != calculate_sentiment(text)]
+    print(f"Batched sentiment matches per-text results: {not mismatches}")
+
+    print("\n--- Sentence-Level Sentiment Test Case ---")
+    from sentence_sentiment import analyze_sentences
+    mixed_turn = Turn(1, "Speaker A", "The food was good. But the service was bad. I don't know...")
+    for _, row in analyze_sentences([mixed_turn]).iterrows():
+        print(f"Sentence {row[COL_SENTENCE_NUM]}: '{row[COL_SENTENCE]}' => Sentiment: {row[COL_SENTIMENT_LABEL]}, "
+              f"Score: {row[COL_SENTIMENT_SCORE]:.4f}")
 
     print("\n--- Filler Word Ratio Test Cases ---")
     filler_tests = [
@@ -154,4 +686,7 @@ if __name__ == "__main__":
     ]
     for text in filler_tests:
         result = calculate_filler_word_stats(text)
-        print(f"Text: '{text}' => Filler Count: {result['count']}, Total Words: {result['total_words']}, Ratio: {result['ratio']:.2%}") 
\ No newline at end of file
+        print(f"Text: '{text}' => Filler Count: {result['count']}, Total Words: {result['total_words']}, Ratio: {result['ratio']:.2%}")
+    batched = calculate_filler_word_stats_batch(filler_tests)
+    mismatches = [text for text, b in zip(filler_tests, batched) if b != calculate_filler_word_stats(text)]
+    print(f"Batched filler stats match per-text results: {not mismatches}") 
\ No newline at end of file
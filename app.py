@@ -1,39 +1,75 @@
 import streamlit as st
 st.set_page_config(layout="wide", page_title="Transcript Analysis Dashboard", page_icon="🎙️")
 
-import pandas as pd
-from analysis_utils import analyze_transcript_data, parse_transcript
-from ui_components import display_transcript_analysis_tab, display_summary_metrics_tab
-from constants import COL_DIALOGUE
-
-@st.cache_data
-def get_analysis_results(file_path: str) -> pd.DataFrame:
-    analysis_list = analyze_transcript_data(file_path)
-    if not analysis_list:
-        return pd.DataFrame()
-    return pd.DataFrame(analysis_list)
-
-@st.cache_data
-def get_raw_turns(file_path: str) -> list:
-    return parse_transcript(file_path)
+import time
+from analysis_cache import AnalysisCache
+from analysis_utils import transcript_content_hash
+from analysis_jobs import JobManager, DONE, CANCELLED, FAILED
+from corpus_store import CorpusStore
+from transcript_formats import format_from_path
+from incremental_analysis import IncrementalTranscriptAnalyzer
+from ui_components import display_transcript_analysis_tab, display_summary_metrics_tab, display_performance_panel, \
+    display_chat_transcript, display_job_progress, display_corpus_tab, display_dynamics_tab
+from instrumentation import recorder
+from constants import LIVE_REFRESH_SECONDS, JOB_POLL_SECONDS
+
+@st.cache_resource
+def load_analysis_cache() -> AnalysisCache:
+    """Opens the persistent per-turn analysis cache shared by all sessions."""
+    return AnalysisCache()
+
+@st.cache_resource
+def load_corpus_store() -> CorpusStore:
+    """Opens the persistent corpus of analyzed transcripts shared by all sessions."""
+    return CorpusStore()
+
+def add_to_corpus(name: str, job) -> None:
+    """Stores a finished job's results in the corpus unless that transcript is already there."""
+    corpus = load_corpus_store()
+    if corpus.has_transcript(job.job_id):
+        return
+    try:
+        with recorder.stage('corpus_ingest'):
+            corpus.add_dataframe(name, job.job_id, job.dataframe())
+    except Exception as e:
+        recorder.record_error('corpus', e)
+        st.sidebar.warning(f"Could not add the transcript to the corpus: {e}")
+
+def read_transcript_bytes(file_path: str) -> bytes:
+    with open(file_path, 'rb') as file:
+        return file.read()
+
+@st.cache_resource
+def get_job_manager() -> JobManager:
+    """Background analysis jobs, shared by all sessions so each distinct transcript is analyzed once."""
+    return JobManager(cache=load_analysis_cache())
+
+def get_live_analyzer(file_path: str) -> IncrementalTranscriptAnalyzer:
+    """Returns this session's incremental analyzer for file_path, creating it on first use."""
+    analyzer = st.session_state.get('live_analyzer')
+    if analyzer is None or analyzer.file_path != file_path:
+        analyzer = IncrementalTranscriptAnalyzer(file_path, cache=load_analysis_cache())
+        st.session_state['live_analyzer'] = analyzer
+    return analyzer
 
 def main():
     st.title("🎙️ Transcript Analysis Dashboard")
     st.markdown("""
     This dashboard analyzes dialogue turns for sentiment, filler-word usage,
     and provides insights into conversation patterns.
-    Upload your transcript file (UTF-8 encoded `.txt`) or use the default.
-    The transcript should follow the format: `Speaker A: Dialogue text...` on new lines.
+    Upload your transcript file (UTF-8 encoded) or use the default.
+    Plain-text transcripts should follow the format: `Speaker A: Dialogue text...` on new lines;
+    timestamped SRT, WebVTT and JSON/JSON Lines transcripts from ASR tools are also accepted
+    and add talk-time metrics to the summary.
     """)
 
-    uploaded_file = st.sidebar.file_uploader("Upload Transcript File (transcript.txt)", type=["txt"])
+    uploaded_file = st.sidebar.file_uploader("Upload Transcript File", type=["txt", "srt", "vtt", "json", "jsonl"])
     use_default_file = st.sidebar.checkbox("Use default transcript.txt", True)
 
     transcript_file_path = 'transcript.txt'
+    uploaded_bytes = None
     if uploaded_file is not None and not use_default_file:
-        with open("temp_transcript.txt", "wb") as f:
-            f.write(uploaded_file.getvalue())
-        transcript_file_path = "temp_transcript.txt"
+        uploaded_bytes = uploaded_file.getvalue()
         st.sidebar.success(f"Using uploaded file: {uploaded_file.name}")
     elif use_default_file:
         st.sidebar.info("Using default 'transcript.txt'.")
@@ -41,14 +77,55 @@ def main():
         st.warning("Please upload a transcript file or select 'Use default transcript.txt'.")
         return
 
+    live_mode = st.sidebar.checkbox("Live mode (auto-refresh growing transcript)", False)
+    if live_mode and uploaded_bytes is not None:
+        st.sidebar.info("Live mode follows the transcript file on disk; the uploaded file is analyzed once.")
+        live_mode = False
+    job = None
     try:
-        df_results = get_analysis_results(transcript_file_path)
-        raw_turns_for_display = get_raw_turns(transcript_file_path)
+        if live_mode:
+            live_analyzer = get_live_analyzer(transcript_file_path)
+            live_analyzer.update()
+            df_results = live_analyzer.dataframe()
+            raw_turns_for_display = live_analyzer.turns()
+            st.sidebar.caption(f"Live: {len(raw_turns_for_display)} turns, refreshing every {LIVE_REFRESH_SECONDS}s.")
+        else:
+            transcript_bytes = uploaded_bytes if uploaded_bytes is not None else read_transcript_bytes(transcript_file_path)
+            transcript_format = format_from_path(uploaded_file.name if uploaded_bytes is not None else transcript_file_path)
+            job = get_job_manager().submit(transcript_content_hash(transcript_bytes), transcript_bytes,
+                                           fmt=transcript_format)
+            df_results = job.dataframe()
+            raw_turns_for_display = job.turns
+    except FileNotFoundError:
+        st.error(f"Error: Transcript file '{transcript_file_path}' not found.")
+        return
     except Exception as e:
         st.error(f"A critical error occurred during analysis: {e}")
         return
 
+    if job is not None and job.status == FAILED:
+        st.error(job.error)
+        if st.button("Retry analysis"):
+            get_job_manager().submit(job.job_id, transcript_bytes, restart=True, fmt=transcript_format)
+            st.rerun()
+        return
+    if job is not None and not job.finished:
+        display_job_progress(job)
+        if df_results.empty:
+            time.sleep(JOB_POLL_SECONDS)
+            st.rerun()
+    elif job is not None and job.status == CANCELLED:
+        st.warning(f"Analysis cancelled after {job.completed_turns} of {job.total_turns or 0} turns; "
+                   "showing partial results.")
+        if st.button("Restart analysis"):
+            get_job_manager().submit(job.job_id, transcript_bytes, restart=True, fmt=transcript_format)
+            st.rerun()
+
     if df_results.empty and not raw_turns_for_display:
+        if live_mode:
+            st.info("Waiting for transcript content...")
+            time.sleep(LIVE_REFRESH_SECONDS)
+            st.rerun()
         st.error("Failed to load or parse the transcript. Please check the file format and content.")
         return
     if df_results.empty and raw_turns_for_display:
@@ -57,28 +134,37 @@ def main():
         st.error("Analysis did not produce any results. The transcript might be empty or in an unexpected format.")
         return
 
-    tab_titles = ["💬 Transcript & Turn Analysis", "📊 Summary Metrics"]
+    if job is not None and job.status == DONE:
+        add_to_corpus(uploaded_file.name if uploaded_bytes is not None else transcript_file_path, job)
+
+    tab_titles = ["💬 Transcript & Turn Analysis", "📊 Summary Metrics", "📈 Conversation Dynamics", "🗂️ Corpus"]
     if df_results.empty:
         tab_titles = ["💬 Transcript Display"]
 
     tabs = st.tabs(tab_titles)
 
-    with tabs[0]:
-        if df_results.empty and raw_turns_for_display:
-            st.header("🗣️ Conversation Transcript")
-            for turn in raw_turns_for_display:
-                 st.markdown(f"**{turn['speaker']}**: {turn['text']}")
-        elif not df_results.empty:
-            display_transcript_analysis_tab(df_results, raw_turns_for_display)
-        else:
-            st.info("No transcript content to display.")
-
-    if len(tabs) > 1:
-        with tabs[1]:
-            if not df_results.empty:
-                display_summary_metrics_tab(df_results)
+    with recorder.stage('render'):
+        with tabs[0]:
+            if df_results.empty and raw_turns_for_display:
+                st.header("🗣️ Conversation Transcript")
+                display_chat_transcript(raw_turns_for_display)
+            elif not df_results.empty:
+                display_transcript_analysis_tab(df_results, raw_turns_for_display)
             else:
-                st.info("No analysis data available for summary metrics.")
+                st.info("No transcript content to display.")
+
+        if len(tabs) > 1:
+            with tabs[1]:
+                if not df_results.empty:
+                    display_summary_metrics_tab(df_results, job.timing if job is not None else None)
+                else:
+                    st.info("No analysis data available for summary metrics.")
+            with tabs[2]:
+                display_dynamics_tab(df_results)
+            with tabs[3]:
+                display_corpus_tab(load_corpus_store())
+
+    display_performance_panel(recorder)
 
     st.sidebar.markdown("---")
     st.sidebar.markdown("**About this App:**")
@@ -87,5 +173,12 @@ def main():
     Built with Python, Streamlit, Hugging Face Transformers, and spaCy.
     """)
 
+    if live_mode:
+        time.sleep(LIVE_REFRESH_SECONDS)
+        st.rerun()
+    elif job is not None and not job.finished:
+        time.sleep(JOB_POLL_SECONDS)
+        st.rerun()
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file
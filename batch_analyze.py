@@ -0,0 +1,293 @@
+"""
+Headless batch analysis of transcript files.
+
+Analyzes every transcript matched by the given directories or glob patterns on a
+process pool (one model load per worker) and writes, per transcript, the per-turn
+results and a per-speaker summary to the output directory. Completed transcripts
+are recorded in a manifest so that an interrupted run can be resumed.
+
+Usage:
+    python batch_analyze.py transcripts/ "archive/**/*.txt" --output-dir results --workers 4
+"""
+import argparse
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from importlib.util import find_spec
+from typing import List, Dict, Any, Optional, Tuple
+from instrumentation import PerfRecorder
+from constants import ANALYSIS_CHUNK_SIZE, COL_SPEAKER, COL_SENTIMENT_LABEL, COL_FILLER_COUNT, COL_TOTAL_WORDS
+
+MANIFEST_NAME = "_completed.jsonl"
+
+_worker_cache = None
+
+def find_transcripts(inputs: List[str], extensions: Optional[Tuple[str, ...]] = None) -> List[str]:
+    """
+    Expands directories (recursively) and glob patterns into a sorted list of
+    transcript files. Directories are searched for the extensions of all
+    supported transcript formats by default.
+    """
+    if extensions is None:
+        from transcript_formats import transcript_extensions
+        extensions = transcript_extensions()
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                paths.update(os.path.join(root, name) for name in files if name.lower().endswith(extensions))
+        else:
+            paths.update(path for path in glob.glob(item, recursive=True) if os.path.isfile(path))
+    return sorted(os.path.abspath(path) for path in paths)
+
+def output_stem(path: str) -> str:
+    """Output file stem for a transcript; the path hash keeps same-named files apart."""
+    name = os.path.splitext(os.path.basename(path))[0]
+    return f"{name}-{hashlib.sha1(path.encode('utf-8')).hexdigest()[:8]}"
+
+def file_signature(path: str) -> Dict[str, Any]:
+    stat = os.stat(path)
+    return {'source': path, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+def load_completed(output_dir: str) -> set:
+    """Reads the manifest of transcripts completed by earlier runs."""
+    completed = set()
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return completed
+    with open(manifest_path, 'r', encoding='utf-8') as manifest:
+        for line in manifest:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # partially written line from an interrupted run
+            completed.add((entry['source'], entry['size'], entry['mtime_ns']))
+    return completed
+
+def summarize_speakers(rows: List[Dict[str, Any]], summary: Dict[str, Dict[str, Any]]) -> None:
+    """Accumulates per-speaker totals for a chunk of result rows into summary."""
+    for row in rows:
+        speaker = summary.setdefault(row[COL_SPEAKER], {
+            'Speaker': row[COL_SPEAKER], 'Turns': 0, 'Total Words': 0, 'Filler Words': 0,
+            'Positive': 0, 'Neutral': 0, 'Negative': 0, 'Error': 0
+        })
+        speaker['Turns'] += 1
+        speaker['Total Words'] += row[COL_TOTAL_WORDS]
+        speaker['Filler Words'] += row[COL_FILLER_COUNT]
+        label = str(row[COL_SENTIMENT_LABEL]).capitalize()
+        if label in ('Positive', 'Neutral', 'Negative', 'Error'):
+            speaker[label] += 1
+
+def finalize_summary(summary: Dict[str, Dict[str, Any]], timing: Any = None) -> List[Dict[str, Any]]:
+    """Adds the derived per-speaker columns, and the talk-time columns of timed transcripts."""
+    timing_rows = {row['Speaker']: row for row in timing.speaker_rows()} if timing is not None and timing.has_times else {}
+    speakers = []
+    for speaker in summary.values():
+        speaker['Avg Words/Turn'] = round(speaker['Total Words'] / speaker['Turns'], 1)
+        speaker['Filler Ratio'] = round(speaker['Filler Words'] / speaker['Total Words'], 4) if speaker['Total Words'] > 0 else 0.0
+        speaker.update(timing_rows.get(speaker['Speaker'], {}))
+        speakers.append(speaker)
+    return speakers
+
+class _JsonlWriter:
+    def __init__(self, path: str):
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        for row in rows:
+            self._file.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+    def close(self) -> None:
+        self._file.close()
+
+class _ParquetWriter:
+    def __init__(self, path: str):
+        self._path = path
+        self._writer = None
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Appends rows. The columns are the union of the first rows' keys (rows may
+        lack some, e.g. speakers without talk-time columns); later rows are
+        written against that schema, with missing values as nulls.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        columns = self._writer.schema.names if self._writer is not None else \
+            list(dict.fromkeys(key for row in rows for key in row))
+        table = pa.Table.from_pydict({column: [row.get(column) for row in rows] for column in columns})
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self._path, table.schema)
+        self._writer.write_table(table.cast(self._writer.schema))
+
+    def close(self) -> None:
+        if self._writer is None:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            pq.write_table(pa.table({}), self._path)
+        else:
+            self._writer.close()
+
+def _open_writer(path: str, output_format: str):
+    return _ParquetWriter(path) if output_format == 'parquet' else _JsonlWriter(path)
+
+def _init_worker(use_cache: bool, threads_per_worker: int) -> None:
+    """Loads the models once per worker process."""
+    global _worker_cache
+    from analysis_utils import load_sentiment_analyzer, load_spacy_model
+    if threads_per_worker > 0:
+        load_sentiment_analyzer(intra_op_threads=threads_per_worker)
+    else:
+        load_sentiment_analyzer()
+    load_spacy_model()
+    if use_cache:
+        from analysis_cache import AnalysisCache
+        _worker_cache = AnalysisCache()
+
+def _analyze_file(path: str, output_dir: str, output_format: str, chunk_size: int) -> Dict[str, Any]:
+    from analysis_utils import iter_analysis_results, transcript_file_hash
+    from transcript_formats import TranscriptTiming, format_from_path
+    from instrumentation import recorder
+    start = time.perf_counter()
+    stem = os.path.join(output_dir, output_stem(path))
+    turns_path = f"{stem}.turns.{output_format}"
+    speakers_path = f"{stem}.speakers.{output_format}"
+    summary: Dict[str, Dict[str, Any]] = {}
+    num_turns = 0
+    timing = TranscriptTiming()
+    writer = _open_writer(turns_path + '.tmp', output_format)
+    try:
+        for rows in iter_analysis_results(path, chunk_size, timing, fmt=format_from_path(path), cache=_worker_cache):
+            writer.write(rows)
+            summarize_speakers(rows, summary)
+            num_turns += len(rows)
+    except Exception:
+        writer.close()
+        os.remove(turns_path + '.tmp')
+        raise
+    writer.close()
+    speakers_writer = _open_writer(speakers_path + '.tmp', output_format)
+    speakers = finalize_summary(summary, timing)
+    if speakers:
+        speakers_writer.write(speakers)
+    speakers_writer.close()
+    os.replace(turns_path + '.tmp', turns_path)
+    os.replace(speakers_path + '.tmp', speakers_path)
+    # Hand this file's metrics (and, for the first file, the model load times) to the parent.
+    metrics = recorder.snapshot()
+    recorder.reset()
+    return {'turns': num_turns, 'seconds': round(time.perf_counter() - start, 3), 'turns_path': turns_path,
+            'content_hash': transcript_file_hash(path), 'metrics': metrics}
+
+def run_batch(inputs: List[str], output_dir: str, workers: int = 1, output_format: str = 'jsonl',
+              chunk_size: int = ANALYSIS_CHUNK_SIZE, use_cache: bool = True, resume: bool = True,
+              threads_per_worker: Optional[int] = None, metrics: Optional[PerfRecorder] = None,
+              corpus_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Analyzes all matched transcripts and returns run totals. Worker metrics are
+    merged into metrics, if given. With corpus_path, each completed transcript's
+    results are also added to that corpus store (see corpus_store.CorpusStore).
+    Files under output_dir are never treated as transcripts, since its results
+    and manifest are JSON Lines files too.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    output_root = os.path.join(os.path.abspath(output_dir), '')
+    transcripts = [path for path in find_transcripts(inputs) if not path.startswith(output_root)]
+    completed = load_completed(output_dir) if resume else set()
+    pending = []
+    for path in transcripts:
+        signature = file_signature(path)
+        if (signature['source'], signature['size'], signature['mtime_ns']) not in completed:
+            pending.append(signature)
+    skipped = len(transcripts) - len(pending)
+    print(f"Found {len(transcripts)} transcripts, {skipped} already completed, {len(pending)} to analyze.",
+          file=sys.stderr)
+    if threads_per_worker is None:
+        threads_per_worker = max(1, (os.cpu_count() or 1) // max(1, workers))
+
+    corpus = None
+    if corpus_path:
+        from corpus_store import CorpusStore
+        corpus = CorpusStore(corpus_path)
+    totals = {'files': 0, 'failed': 0, 'skipped': skipped, 'turns': 0}
+    start = time.perf_counter()
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    with open(manifest_path, 'a', encoding='utf-8') as manifest, ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker, initargs=(use_cache, threads_per_worker)) as pool:
+        futures = {
+            pool.submit(_analyze_file, signature['source'], output_dir, output_format, chunk_size): signature
+            for signature in pending
+        }
+        for future in as_completed(futures):
+            signature = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                totals['failed'] += 1
+                if metrics is not None:
+                    metrics.record_error('file', e)
+                print(f"FAILED {signature['source']}: {e}", file=sys.stderr)
+                continue
+            file_metrics = result.pop('metrics')
+            if metrics is not None:
+                metrics.merge(file_metrics)
+            if corpus is not None:
+                try:
+                    corpus.add_results_file(signature['source'], result['content_hash'], result['turns_path'])
+                except Exception as e:
+                    if metrics is not None:
+                        metrics.record_error('corpus', e)
+                    print(f"CORPUS INGEST FAILED {signature['source']}: {e}", file=sys.stderr)
+            manifest.write(json.dumps({**signature, **result}) + '\n')
+            manifest.flush()
+            totals['files'] += 1
+            totals['turns'] += result['turns']
+            elapsed = time.perf_counter() - start
+            print(f"[{totals['files'] + totals['failed']}/{len(pending)}] {signature['source']}: "
+                  f"{result['turns']} turns in {result['seconds']:.2f}s | "
+                  f"overall {totals['turns'] / elapsed:.1f} turns/sec", file=sys.stderr)
+    if corpus is not None:
+        corpus.close()
+    totals['seconds'] = round(time.perf_counter() - start, 3)
+    totals['turns_per_sec'] = round(totals['turns'] / totals['seconds'], 2) if totals['seconds'] > 0 else 0.0
+    return totals
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs='+', help="Transcript directories or glob patterns.")
+    parser.add_argument("--output-dir", required=True, help="Directory for results and the resume manifest.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Number of worker processes.")
+    parser.add_argument("--format", dest="output_format", choices=['jsonl', 'parquet'], default='jsonl')
+    parser.add_argument("--chunk-size", type=int, default=ANALYSIS_CHUNK_SIZE, help="Turns analyzed per chunk.")
+    parser.add_argument("--threads-per-worker", type=int, default=None,
+                        help="Inference intra-op threads per worker, for torch or ONNX Runtime (default: CPU count / workers).")
+    parser.add_argument("--no-cache", action='store_true', help="Do not use the persistent analysis cache.")
+    parser.add_argument("--no-resume", action='store_true', help="Re-analyze transcripts already completed.")
+    parser.add_argument("--corpus", metavar="PATH", help="Also add the results to this corpus store (SQLite).")
+    parser.add_argument("--metrics-json", help="Write per-stage metrics for the run to this JSON file.")
+    parser.add_argument("--metrics-prom", help="Write per-stage metrics in Prometheus text format to this file.")
+    args = parser.parse_args(argv)
+    if args.output_format == 'parquet' and find_spec('pyarrow') is None:
+        parser.error("--format parquet requires pyarrow (pip install pyarrow).")
+
+    metrics = PerfRecorder()
+    totals = run_batch(args.inputs, args.output_dir, workers=args.workers, output_format=args.output_format,
+                       chunk_size=args.chunk_size, use_cache=not args.no_cache, resume=not args.no_resume,
+                       threads_per_worker=args.threads_per_worker, metrics=metrics, corpus_path=args.corpus)
+    if args.metrics_json:
+        with open(args.metrics_json, 'w', encoding='utf-8') as file:
+            file.write(metrics.to_json())
+    if args.metrics_prom:
+        with open(args.metrics_prom, 'w', encoding='utf-8') as file:
+            file.write(metrics.to_prometheus())
+    print(json.dumps(totals))
+    return 1 if totals['failed'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Microbenchmark: single-pass filler matcher vs. the original per-filler regex loop.
+
+Usage:
+    python benchmarks/bench_filler_matcher.py --turns 20000 --words-per-turn 40
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from constants import FILLER_WORDS
+from filler_matcher import count_filler_words, find_filler_words
+from synthetic import generate_turn_text
+
+def legacy_count_filler_words(text: str) -> int:
+    """The per-filler loop previously used by calculate_filler_word_stats."""
+    filler_count = 0
+    text_lower = text.lower()
+    for filler in FILLER_WORDS:
+        filler_count += len(re.findall(r'\b' + re.escape(filler) + r'\b', text_lower))
+    return filler_count
+
+def make_turns(num_turns: int, words_per_turn: int, filler_density: float, seed: int) -> list:
+    rng = random.Random(seed)
+    return [generate_turn_text(rng, words_per_turn, filler_density) for _ in range(num_turns)]
+
+def time_best(func, turns: list, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in turns:
+            func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=20000)
+    parser.add_argument("--words-per-turn", type=int, default=40)
+    parser.add_argument("--filler-density", type=float, default=0.1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=13)
+    args = parser.parse_args()
+
+    turns = make_turns(args.turns, args.words_per_turn, args.filler_density, args.seed)
+    mismatches = sum(1 for text in turns if legacy_count_filler_words(text) != count_filler_words(text))
+
+    legacy = time_best(legacy_count_filler_words, turns, args.repeat)
+    single_pass = time_best(count_filler_words, turns, args.repeat)
+    with_spans = time_best(find_filler_words, turns, args.repeat)
+    print(json.dumps({
+        "turns": args.turns,
+        "words_per_turn": args.words_per_turn,
+        "filler_density": args.filler_density,
+        "mismatched_turns": mismatches,
+        "legacy_loop_s": round(legacy, 4),
+        "single_pass_count_s": round(single_pass, 4),
+        "single_pass_with_spans_s": round(with_spans, 4),
+        "speedup_count": round(legacy / single_pass, 2),
+        "speedup_with_spans": round(legacy / with_spans, 2),
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Cold-start benchmark for the analysis core and the Streamlit app.
+
+Each measurement runs in a fresh interpreter so module caches do not carry over.
+Reports the import latency of the core modules and of app.py separately and,
+with --with-models, the first-use load time of the sentiment and spaCy models.
+Results are printed as JSON so they can be compared across commits.
+
+Usage:
+    python benchmarks/bench_startup.py --runs 5 --with-models
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = {
+    "core": "import analysis_utils",
+    "core_parse_transcript": "from analysis_utils import parse_transcript; parse_transcript('transcript.txt')",
+    "filler_matcher": "import filler_matcher",
+    "app": "import app",
+}
+
+MODEL_TARGETS = {
+    "sentiment_model_load": ("import analysis_utils", "analysis_utils.load_sentiment_analyzer()"),
+    "spacy_model_load": ("import analysis_utils", "analysis_utils.load_spacy_model()"),
+}
+
+TIMER = """
+import time, json
+{setup}
+_start = time.perf_counter()
+{statement}
+print(json.dumps(time.perf_counter() - _start))
+"""
+
+def time_in_fresh_interpreter(statement: str, setup: str = "") -> float:
+    completed = subprocess.run(
+        [sys.executable, "-c", TIMER.format(setup=setup, statement=statement)],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def measure(statement: str, setup: str, runs: int) -> dict:
+    try:
+        samples = [time_in_fresh_interpreter(statement, setup) for _ in range(runs)]
+    except subprocess.CalledProcessError as e:
+        return {"error": e.stderr.strip().splitlines()[-1] if e.stderr else str(e)}
+    return {
+        "median_ms": round(statistics.median(samples) * 1000, 2),
+        "min_ms": round(min(samples) * 1000, 2),
+        "max_ms": round(max(samples) * 1000, 2),
+        "runs": runs,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--with-models", action="store_true", help="Also time first-use model loading.")
+    args = parser.parse_args()
+
+    results = {name: measure(statement, "", args.runs) for name, statement in TARGETS.items()}
+    if args.with_models:
+        for name, (setup, statement) in MODEL_TARGETS.items():
+            results[name] = measure(statement, setup, args.runs)
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
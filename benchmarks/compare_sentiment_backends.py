@@ -0,0 +1,124 @@
+"""
+Accuracy agreement and throughput of the sentiment inference backends.
+
+Scores the turns of the given transcripts (default: the sample transcript.txt)
+with the fp32 transformers pipeline as the reference, and with the ONNX Runtime
+backend in fp32 and dynamically quantized int8. For each backend it reports the
+model load time, throughput (turns/s, median of --repeat runs) and, against
+the reference, the label agreement, a confusion table of disagreeing labels and
+the score drift on turns where labels agree. Backends that cannot be loaded are
+reported with their error instead of falling back.
+
+Usage:
+    python benchmarks/compare_sentiment_backends.py transcript.txt --synthetic-turns 2000 --threads 4
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import analysis_utils
+from analysis_utils import parse_transcript, calculate_sentiment_batch
+from sentiment_backends import load_transformers_pipeline, load_onnx_pipeline
+from synthetic import generate_turn_text
+
+BACKENDS = {
+    'transformers': lambda threads: load_transformers_pipeline(threads),
+    'onnx': lambda threads: load_onnx_pipeline(False, threads),
+    'onnx-int8': lambda threads: load_onnx_pipeline(True, threads),
+}
+REFERENCE = 'transformers'
+
+def load_texts(patterns: List[str], synthetic_turns: int, seed: int) -> List[str]:
+    texts = []
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern, recursive=True)):
+            texts.extend(turn.text for turn in parse_transcript(path))
+    rng = random.Random(seed)
+    texts.extend(generate_turn_text(rng, 20, 0.08) for _ in range(synthetic_turns))
+    return texts
+
+def score_with_backend(name: str, texts: List[str], args: argparse.Namespace) -> Dict[str, Any]:
+    start = time.perf_counter()
+    try:
+        pipeline = BACKENDS[name](args.threads)
+    except Exception as e:
+        return {'error': f"{type(e).__name__}: {e}"}
+    load_s = time.perf_counter() - start
+    analysis_utils.set_model_backends(sentiment_analyzer=pipeline)
+    calculate_sentiment_batch(texts[:args.batch_size], args.batch_size)  # warm-up
+    samples = []
+    results = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        results = calculate_sentiment_batch(texts, args.batch_size)
+        samples.append(time.perf_counter() - start)
+    median = statistics.median(samples)
+    return {
+        'load_s': round(load_s, 3),
+        'median_s': round(median, 4),
+        'turns_per_s': round(len(texts) / median, 1) if median > 0 else None,
+        'results': results,
+    }
+
+def agreement(reference: List[Dict[str, Any]], candidate: List[Dict[str, Any]], texts: List[str]) -> Dict[str, Any]:
+    confusion: Dict[str, int] = {}
+    score_diffs = []
+    examples = []
+    for text, ref, cand in zip(texts, reference, candidate):
+        if ref['label'] == cand['label']:
+            score_diffs.append(abs(ref['score'] - cand['score']))
+            continue
+        key = f"{ref['label']}->{cand['label']}"
+        confusion[key] = confusion.get(key, 0) + 1
+        if len(examples) < 10:
+            examples.append({'text': text[:120], 'reference': ref['label'], 'backend': cand['label']})
+    return {
+        'label_agreement': round(1 - sum(confusion.values()) / len(texts), 4) if texts else None,
+        'disagreements': confusion,
+        'mean_abs_score_diff': round(statistics.mean(score_diffs), 5) if score_diffs else None,
+        'max_abs_score_diff': round(max(score_diffs), 5) if score_diffs else None,
+        'examples': examples,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("transcripts", nargs="*", default=["transcript.txt"], help="Transcript files or glob patterns.")
+    parser.add_argument("--synthetic-turns", type=int, default=0, help="Also score this many synthetic turns.")
+    parser.add_argument("--backends", nargs="+", choices=list(BACKENDS), default=list(BACKENDS))
+    parser.add_argument("--threads", type=int, default=0, help="Intra-op threads (0 = runtime default).")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the JSON report to this file.")
+    args = parser.parse_args()
+
+    texts = load_texts(args.transcripts, args.synthetic_turns, args.seed)
+    backends = [REFERENCE] + [name for name in args.backends if name != REFERENCE]
+    runs = {name: score_with_backend(name, texts, args) for name in backends}
+    report: Dict[str, Any] = {'turns': len(texts), 'threads': args.threads, 'reference': REFERENCE, 'backends': {}}
+    reference = runs[REFERENCE].get('results')
+    for name, run in runs.items():
+        entry = {key: value for key, value in run.items() if key != 'results'}
+        if reference is not None and 'results' in run:
+            if name != REFERENCE:
+                entry.update(agreement(reference, run['results'], texts))
+                if runs[REFERENCE]['median_s'] > 0 and run['median_s'] > 0:
+                    entry['speedup'] = round(runs[REFERENCE]['median_s'] / run['median_s'], 2)
+        report['backends'][name] = entry
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(output + '\n')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Load test for analysis_service.py.
+
+Runs --concurrency clients that each send requests back to back for --duration
+seconds (after waiting for /ready), then reports throughput, p50/p90/p99/max
+latency of successful requests, and counts of rejected (503) and failed requests.
+Each request carries --texts-per-request synthetic turn texts.
+
+With --self-hosted the service is started in this process on a free port with
+the deterministic stub models, so the run measures the HTTP and micro-batching
+overhead offline; otherwise point --url at a running service.
+
+Usage:
+    python benchmarks/load_test_service.py --self-hosted --concurrency 32 --duration 10
+    python benchmarks/load_test_service.py --url http://127.0.0.1:8080 --concurrency 16
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from typing import List, Dict, Any
+
+import aiohttp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import generate_turn_text
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return float('nan')
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+async def wait_ready(session: aiohttp.ClientSession, url: str, timeout: float) -> None:
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            async with session.get(f"{url}/ready") as response:
+                if response.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        if time.perf_counter() > deadline:
+            raise TimeoutError(f"{url} did not become ready within {timeout}s")
+        await asyncio.sleep(0.2)
+
+async def client(session: aiohttp.ClientSession, url: str, payloads: List[Dict[str, Any]], stop_at: float,
+                 stats: Dict[str, Any]) -> None:
+    i = 0
+    while time.perf_counter() < stop_at:
+        payload = payloads[i % len(payloads)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            async with session.post(f"{url}/analyze/texts", json=payload) as response:
+                await response.read()
+                status = response.status
+        except aiohttp.ClientError:
+            stats['failed'] += 1
+            continue
+        if status == 200:
+            stats['latencies'].append(time.perf_counter() - start)
+        elif status == 503:
+            stats['rejected'] += 1
+            await asyncio.sleep(0.01)
+        else:
+            stats['failed'] += 1
+
+async def run_load(url: str, args: argparse.Namespace) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    payloads = [
+        {'texts': [generate_turn_text(rng, args.words_per_turn, 0.08) for _ in range(args.texts_per_request)]}
+        for _ in range(256)
+    ]
+    stats: Dict[str, Any] = {'latencies': [], 'rejected': 0, 'failed': 0}
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await wait_ready(session, url, args.ready_timeout)
+        start = time.perf_counter()
+        stop_at = start + args.duration
+        await asyncio.gather(*(client(session, url, payloads, stop_at, stats) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+    latencies = sorted(stats['latencies'])
+    return {
+        'url': url,
+        'concurrency': args.concurrency,
+        'texts_per_request': args.texts_per_request,
+        'duration_s': round(elapsed, 2),
+        'requests_ok': len(latencies),
+        'requests_rejected': stats['rejected'],
+        'requests_failed': stats['failed'],
+        'requests_per_s': round(len(latencies) / elapsed, 1),
+        'texts_per_s': round(len(latencies) * args.texts_per_request / elapsed, 1),
+        'latency_ms': {
+            name: round(percentile(latencies, fraction) * 1000, 2)
+            for name, fraction in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99), ('max', 1.0))
+        },
+    }
+
+async def run_self_hosted(args: argparse.Namespace) -> Dict[str, Any]:
+    from aiohttp import web
+    import analysis_utils
+    from analysis_service import AnalysisService
+    from instrumentation import recorder
+    from stub_backends import StubSentimentPipeline, StubNLP
+    analysis_utils.set_model_backends(StubSentimentPipeline(), StubNLP())
+    service = AnalysisService(max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+    runner = web.AppRunner(service.make_app())
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        report = await run_load(f"http://127.0.0.1:{port}", args)
+    finally:
+        await runner.cleanup()
+    counters = recorder.snapshot()['counters']
+    if counters.get('service_batches'):
+        report['mean_batch_texts'] = round(counters['service_batch_texts'] / counters['service_batches'], 1)
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--self-hosted", action="store_true", help="Start the service in-process with stub models.")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--texts-per-request", type=int, default=1)
+    parser.add_argument("--words-per-turn", type=int, default=20)
+    parser.add_argument("--max-batch-size", type=int, default=64, help="Micro-batch size (--self-hosted only).")
+    parser.add_argument("--max-wait-ms", type=float, default=10, help="Micro-batch deadline (--self-hosted only).")
+    parser.add_argument("--ready-timeout", type=float, default=300.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the JSON report to this file.")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_self_hosted(args) if args.self_hosted else run_load(args.url.rstrip('/'), args))
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(output + '\n')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Reproducible per-stage benchmark of the analysis pipeline.
+
+Generates a synthetic transcript (configurable size, speaker count and filler
+density), then times each stage separately: parsing, filler counting, spaCy word
+counting, sentiment, DataFrame construction, summary aggregation, rolling
+conversation-dynamics metrics and sentence-level sentiment, plus the
+end-to-end analysis into result columns. By default the models are replaced with the
+deterministic stubs in stub_backends.py, so the run is offline and the numbers
+reflect our own code; pass --real-models to benchmark the actual models.
+
+Results are printed (and optionally written) as JSON for comparison across commits.
+
+Usage:
+    python benchmarks/run_benchmarks.py --turns 5000 --speakers 3 --output bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, Any
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import analysis_utils
+from analysis_utils import parse_transcript, count_words_batch, calculate_sentiment_batch, analyze_transcript_columns
+from filler_matcher import count_filler_words
+from stub_backends import StubSentimentPipeline, StubNLP
+from synthetic import write_transcript
+
+def time_stage(func: Callable[[], Any], repeat: int, num_turns: int) -> Dict[str, Any]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    median = statistics.median(samples)
+    return {
+        'median_s': round(median, 6),
+        'min_s': round(min(samples), 6),
+        'per_turn_us': round(median / max(num_turns, 1) * 1e6, 3),
+    }
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    if not args.real_models:
+        analysis_utils.set_model_backends(StubSentimentPipeline(), StubNLP())
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = write_transcript(os.path.join(tmp_dir, 'synthetic_transcript.txt'), args.turns,
+                                num_speakers=args.speakers, words_per_turn=args.words_per_turn,
+                                filler_density=args.filler_density, seed=args.seed)
+        turns = parse_transcript(path)
+        texts = [turn.text for turn in turns]
+        stages = {
+            'parse': time_stage(lambda: parse_transcript(path), args.repeat, len(turns)),
+            'filler': time_stage(lambda: [count_filler_words(text) for text in texts], args.repeat, len(turns)),
+            'spacy_count': time_stage(lambda: count_words_batch(texts), args.repeat, len(turns)),
+            'sentiment': time_stage(lambda: calculate_sentiment_batch(texts), args.repeat, len(turns)),
+            'end_to_end': time_stage(lambda: analyze_transcript_columns(path), args.repeat, len(turns)),
+        }
+        columns = analyze_transcript_columns(path)
+    try:
+        import pandas  # noqa: F401
+    except ImportError:
+        stages['dataframe'] = stages['summary'] = stages['dynamics'] = stages['sentences'] = \
+            {'skipped': 'pandas is not installed'}
+    else:
+        stages['dataframe'] = time_stage(columns.to_dataframe, args.repeat, len(turns))
+        df = columns.to_dataframe()
+        from summary_metrics import summarize_results
+        stages['summary'] = time_stage(lambda: summarize_results(df), args.repeat, len(turns))
+        from conversation_dynamics import conversation_dynamics
+        stages['dynamics'] = time_stage(lambda: conversation_dynamics(df), args.repeat, len(turns))
+        from sentence_sentiment import analyze_sentences
+        stages['sentences'] = time_stage(lambda: analyze_sentences(turns), args.repeat, len(turns))
+    return {
+        'config': {
+            'turns': len(turns), 'speakers': args.speakers, 'words_per_turn': args.words_per_turn,
+            'filler_density': args.filler_density, 'seed': args.seed, 'repeat': args.repeat,
+            'backends': 'real' if args.real_models else 'stub',
+        },
+        'environment': {
+            'git_revision': git_revision(), 'python': platform.python_version(), 'platform': platform.platform(),
+        },
+        'stages': stages,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=2000)
+    parser.add_argument("--speakers", type=int, default=2)
+    parser.add_argument("--words-per-turn", type=int, default=20)
+    parser.add_argument("--filler-density", type=float, default=0.08)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--real-models", action="store_true", help="Use the real sentiment and spaCy models.")
+    parser.add_argument("--output", help="Also write the JSON results to this file.")
+    args = parser.parse_args()
+
+    results = run(args)
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(output + '\n')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Deterministic stand-ins for the sentiment pipeline and the spaCy model.
+
+They implement just the parts of the transformers pipeline / spaCy Language
+interfaces that analysis_utils uses, do no I/O and need no model downloads, so
+benchmark numbers measure our own code. Install them with
+analysis_utils.set_model_backends(StubSentimentPipeline(), StubNLP()).
+"""
+import re
+import zlib
+from typing import List, Dict, Any, Iterable, Iterator, Union
+
+TOKEN_RE = re.compile(r"\w+(?:'\w+)?|[^\w\s]")
+LABELS = ("negative", "neutral", "positive")
+
+class StubTokenizer:
+    model_max_length = 512
+
+    def num_special_tokens_to_add(self, pair: bool = False) -> int:
+        return 2
+
+    def __call__(self, texts: Union[str, List[str]], add_special_tokens: bool = True,
+                 return_offsets_mapping: bool = False, **kwargs) -> Dict[str, Any]:
+        single = isinstance(texts, str)
+        offsets = [[match.span() for match in TOKEN_RE.finditer(text)] for text in ([texts] if single else texts)]
+        return {'offset_mapping': offsets[0] if single else offsets}
+
+class StubSentimentPipeline:
+    """Scores texts with a CRC of their content: deterministic and roughly uniform over labels."""
+
+    def __init__(self):
+        self.tokenizer = StubTokenizer()
+
+    def _scores(self, text: str) -> List[Dict[str, Any]]:
+        digest = zlib.crc32(text.encode('utf-8'))
+        raw = [1 + (digest >> shift) % 97 for shift in (0, 8, 16)]
+        total = sum(raw)
+        scores = [{'label': label, 'score': value / total} for label, value in zip(LABELS, raw)]
+        return sorted(scores, key=lambda item: item['score'], reverse=True)
+
+    def __call__(self, inputs: Union[str, List[str]], top_k: Any = 1, **kwargs):
+        texts = [inputs] if isinstance(inputs, str) else inputs
+        outputs = [self._scores(text) for text in texts]
+        if top_k == 1:
+            outputs = [scores[0] for scores in outputs]
+            return outputs if not isinstance(inputs, str) else [outputs[0]]
+        return outputs
+
+class StubToken:
+    __slots__ = ('text', 'is_punct', 'is_space')
+
+    def __init__(self, text: str):
+        self.text = text
+        self.is_punct = not text[0].isalnum() and text[0] != '_'
+        self.is_space = text.isspace()
+
+class StubNLP:
+    """Tokenizer-only stand-in for a spaCy Language; Docs are plain token lists."""
+    pipe_names: List[str] = []
+
+    def make_doc(self, text: str) -> List[StubToken]:
+        return [StubToken(match.group(0)) for match in TOKEN_RE.finditer(text)]
+
+    __call__ = make_doc
+
+    def pipe(self, texts: Iterable[str], batch_size: int = 256, n_process: int = 1,
+             disable: Iterable[str] = ()) -> Iterator[List[StubToken]]:
+        for text in texts:
+            yield self.make_doc(text)
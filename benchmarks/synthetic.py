@@ -0,0 +1,53 @@
+"""Deterministic synthetic transcripts in the `Speaker X: text` format."""
+import random
+import string
+from typing import List
+from constants import FILLER_WORDS
+
+VOCABULARY = [
+    "the", "service", "was", "really", "good", "but", "delivery", "took", "forever", "we",
+    "should", "call", "them", "about", "refund", "order", "account", "number", "thanks",
+    "for", "waiting", "sorry", "problem", "resolved", "today", "tomorrow", "great", "terrible",
+    "happy", "annoyed", "price", "meeting", "schedule", "update", "team", "customer",
+]
+
+def speaker_labels(num_speakers: int) -> List[str]:
+    """Speaker A, Speaker B, ... falling back to numbers beyond 26 speakers."""
+    if num_speakers <= len(string.ascii_uppercase):
+        return [f"Speaker {letter}" for letter in string.ascii_uppercase[:num_speakers]]
+    return [f"Speaker {i + 1}" for i in range(num_speakers)]
+
+def generate_turn_text(rng: random.Random, words_per_turn: int, filler_density: float) -> str:
+    fillers = sorted(FILLER_WORDS)
+    words = [
+        rng.choice(fillers) if rng.random() < filler_density else rng.choice(VOCABULARY)
+        for _ in range(max(1, int(rng.gauss(words_per_turn, words_per_turn / 4))))
+    ]
+    words[0] = words[0].capitalize()
+    clauses = [' '.join(words[i:i + 7]) for i in range(0, len(words), 7)]
+    return ', '.join(clauses) + rng.choice(['.', '!', '?'])
+
+def generate_transcript(num_turns: int, num_speakers: int = 2, words_per_turn: int = 20,
+                        filler_density: float = 0.08, continuation_rate: float = 0.1, seed: int = 0) -> str:
+    """
+    Builds a transcript of num_turns turns alternating (mostly) between speakers.
+    A fraction of turns (continuation_rate) wraps onto a second line, as real
+    transcripts sometimes do.
+    """
+    rng = random.Random(seed)
+    speakers = speaker_labels(num_speakers)
+    lines = []
+    speaker_index = 0
+    for _ in range(num_turns):
+        if num_speakers > 1:
+            speaker_index = (speaker_index + rng.randint(1, num_speakers - 1)) % num_speakers
+        lines.append(f"{speakers[speaker_index]}: {generate_turn_text(rng, words_per_turn, filler_density)}")
+        if rng.random() < continuation_rate:
+            lines.append(generate_turn_text(rng, max(1, words_per_turn // 2), filler_density))
+        lines.append('')
+    return '\n'.join(lines)
+
+def write_transcript(path: str, num_turns: int, **options) -> str:
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(generate_transcript(num_turns, **options))
+    return path
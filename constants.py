@@ -6,8 +6,53 @@ FILLER_WORDS = {
 }
 
 SENTIMENT_MODEL_NAME = "cardiffnlp/twitter-roberta-base-sentiment-latest"
+SENTIMENT_MODEL_REVISION = "main"
+# Sentiment inference backend: "transformers" (PyTorch pipeline) or "onnx" (ONNX Runtime via
+# optimum, exported on first use; falls back to "transformers" if unavailable).
+SENTIMENT_BACKEND = "transformers"
+SENTIMENT_ONNX_QUANTIZE = False  # dynamic int8 quantization of the ONNX model weights
+SENTIMENT_ONNX_DIR = ".onnx_models"
+SENTIMENT_INTRA_OP_THREADS = 0  # 0 = the runtime's default
 SPACY_MODEL_NAME = "en_core_web_sm"
 
+SENTIMENT_BATCH_SIZE = 32
+SENTIMENT_MAX_TOKENS = 512
+SENTIMENT_WINDOW_OVERLAP = 64
+SPACY_BATCH_SIZE = 256
+SPACY_N_PROCESS = 1
+ANALYSIS_CHUNK_SIZE = 512
+
+LIVE_REFRESH_SECONDS = 2
+
+ANALYSIS_JOB_WORKERS = 2
+ANALYSIS_JOB_CHUNK_SIZE = 128
+ANALYSIS_JOB_MAX_JOBS = 32
+JOB_POLL_SECONDS = 1
+
+TRANSCRIPT_PAGE_SIZE = 200
+CHART_MAX_POINTS = 1500
+DYNAMICS_WINDOW_TURNS = 10  # default trailing window of the rolling conversation-dynamics metrics
+DYNAMICS_SHIFT_TURNS = 3  # turns compared before and after each speaker change
+EXPORT_CHUNK_ROWS = 50_000  # rows encoded per step when building CSV/Parquet/Excel exports
+SENTENCE_SENTIMENT_DEFAULT = False  # sentence-level sentiment is opt-in (one model input per sentence)
+SPEAKER_COLORS = [
+    "#e1f5fe", "#e8f5e9", "#fff3e0", "#f3e5f5", "#fce4ec", "#e0f2f1", "#fffde7", "#ede7f6"
+]
+
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8080
+SERVICE_MAX_BATCH_TEXTS = 64  # texts merged into one model batch across requests
+SERVICE_MAX_WAIT_MS = 10  # how long the first queued text may wait for others to join its batch
+SERVICE_MAX_PENDING_TEXTS = 4096  # queued + in-flight texts before requests are rejected with 503
+SERVICE_MAX_BODY_BYTES = 16 * 1024 * 1024
+
+CORPUS_DB_PATH = ".corpus.sqlite3"
+CORPUS_SEARCH_LIMIT = 500
+
+ANALYSIS_CACHE_PATH = ".analysis_cache.sqlite3"
+ANALYSIS_CACHE_MAX_ENTRIES = 200_000
+
+COL_TRANSCRIPT = "Transcript"
 COL_TURN_NUM = "Turn #"
 COL_SPEAKER = "Speaker"
 COL_DIALOGUE = "Dialogue Text"
@@ -15,4 +60,6 @@ COL_SENTIMENT_LABEL = "Sentiment"
 COL_SENTIMENT_SCORE = "Score"
 COL_FILLER_COUNT = "Filler Words"
 COL_TOTAL_WORDS = "Total Words"
-COL_FILLER_RATIO = "Filler Ratio" 
\ No newline at end of file
+COL_FILLER_RATIO = "Filler Ratio"
+COL_SENTENCE_NUM = "Sentence #"
+COL_SENTENCE = "Sentence" 
\ No newline at end of file
@@ -0,0 +1,147 @@
+from typing import Dict, Any
+import numpy as np
+import pandas as pd
+from summary_metrics import normalized_labels
+from constants import COL_TURN_NUM, COL_SPEAKER, COL_SENTIMENT_LABEL, COL_SENTIMENT_SCORE, COL_FILLER_COUNT, \
+    COL_TOTAL_WORDS, DYNAMICS_WINDOW_TURNS, DYNAMICS_SHIFT_TURNS
+
+SENTIMENT_SIGNS = {'positive': 1.0, 'neutral': 0.0, 'negative': -1.0}
+
+def signed_sentiment(df_analysis: pd.DataFrame) -> np.ndarray:
+    """Sentiment score signed by label: +score for positive, -score for negative, 0 for neutral or errors."""
+    labels = normalized_labels(df_analysis[COL_SENTIMENT_LABEL])
+    signs = np.append(np.array([SENTIMENT_SIGNS.get(label, 0.0) for label in labels.categories]), 0.0)
+    return signs[labels.codes] * df_analysis[COL_SENTIMENT_SCORE].to_numpy(dtype=np.float64)
+
+def _prefix_sums(values: np.ndarray) -> np.ndarray:
+    """Cumulative sums along the first axis with a leading zero row, so window sums are two lookups."""
+    sums = np.zeros((len(values) + 1,) + values.shape[1:], dtype=np.float64)
+    np.cumsum(values, axis=0, out=sums[1:])
+    return sums
+
+def _window_starts(num_values: int, window: int) -> np.ndarray:
+    return np.maximum(np.arange(1, num_values + 1) - window, 0)
+
+def rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing sums over the last window values (fewer at the start), in O(n) from prefix sums."""
+    sums = _prefix_sums(values)
+    return sums[1:] - sums[_window_starts(len(values), window)]
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing means over the last window values (fewer at the start)."""
+    counts = np.minimum(np.arange(1, len(values) + 1), window)
+    return rolling_sum(values, window) / counts.reshape((-1,) + (1,) * (values.ndim - 1))
+
+def _safe_ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, numerator / denominator, 0.0)
+
+def speaker_rolling_filler_ratio(df_analysis: pd.DataFrame, window: int) -> pd.DataFrame:
+    """
+    Each speaker's filler ratio over their own last window turns (filler words
+    over words, pooled), at every turn of that speaker. All speakers are done
+    in one pass: turns are stably sorted by speaker, so each speaker's turns form
+    a contiguous run and windows are clipped at the start of the run.
+    """
+    codes = df_analysis[COL_SPEAKER].astype('category').cat.codes.to_numpy()
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+    fillers = _prefix_sums(df_analysis[COL_FILLER_COUNT].to_numpy(dtype=np.float64)[order])
+    words = _prefix_sums(df_analysis[COL_TOTAL_WORDS].to_numpy(dtype=np.float64)[order])
+    positions = np.arange(len(order))
+    run_starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]) if len(order) else positions
+    run_start = np.repeat(run_starts, np.diff(np.r_[run_starts, len(order)]))
+    starts = np.maximum(positions + 1 - window, run_start)
+    ratio = _safe_ratio(fillers[positions + 1] - fillers[starts], words[positions + 1] - words[starts])
+    result = pd.DataFrame({
+        COL_TURN_NUM: df_analysis[COL_TURN_NUM].to_numpy()[order],
+        COL_SPEAKER: df_analysis[COL_SPEAKER].to_numpy()[order],
+        'Rolling Filler Ratio': ratio,
+    })
+    return result.iloc[np.argsort(order, kind='stable')].reset_index(drop=True)
+
+def speaker_change_shifts(df_analysis: pd.DataFrame, sentiment: np.ndarray, window: int) -> pd.DataFrame:
+    """
+    Mean signed sentiment over the window turns before and from each speaker
+    change (windows are clipped at the ends of the transcript), and the shift
+    between the two.
+    """
+    speakers = df_analysis[COL_SPEAKER].to_numpy()
+    changes = np.flatnonzero(speakers[1:] != speakers[:-1]) + 1
+    sums = _prefix_sums(sentiment)
+    before_start = np.maximum(changes - window, 0)
+    after_end = np.minimum(changes + window, len(sentiment))
+    before = (sums[changes] - sums[before_start]) / np.maximum(changes - before_start, 1)
+    after = (sums[after_end] - sums[changes]) / np.maximum(after_end - changes, 1)
+    return pd.DataFrame({
+        COL_TURN_NUM: df_analysis[COL_TURN_NUM].to_numpy()[changes],
+        'From Speaker': speakers[changes - 1],
+        'To Speaker': speakers[changes],
+        'Sentiment Before': before,
+        'Sentiment After': after,
+        'Shift': after - before,
+    })
+
+def turn_taking_balance(df_analysis: pd.DataFrame, window: int) -> Dict[str, Any]:
+    """
+    Each speaker's share of the words in the last window turns (one cumulative
+    sum over a turns x speakers matrix), plus a balance index: the normalized
+    entropy of those shares (1 = all speakers said equally much, 0 = one speaker
+    said everything).
+    """
+    speakers = df_analysis[COL_SPEAKER].astype('category')
+    codes = speakers.cat.codes.to_numpy()
+    num_speakers = len(speakers.cat.categories)
+    words = np.zeros((len(codes), num_speakers), dtype=np.float64)
+    words[np.arange(len(codes)), codes] = df_analysis[COL_TOTAL_WORDS].to_numpy(dtype=np.float64)
+    window_words = rolling_sum(words, window)
+    shares = _safe_ratio(window_words, window_words.sum(axis=1, keepdims=True))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        entropy = -np.where(shares > 0, shares * np.log(shares), 0.0).sum(axis=1)
+    balance = entropy / np.log(num_speakers) if num_speakers > 1 else np.zeros(len(codes))
+    turn_nums = df_analysis[COL_TURN_NUM].to_numpy()
+    word_share = pd.DataFrame({
+        COL_TURN_NUM: np.tile(turn_nums, num_speakers),
+        COL_SPEAKER: np.repeat(speakers.cat.categories.to_numpy(), len(codes)),
+        'Word Share': shares.T.ravel(),
+    })
+    return {'word_share': word_share, 'balance': balance}
+
+def conversation_dynamics(df_analysis: pd.DataFrame, window: int = DYNAMICS_WINDOW_TURNS,
+                          shift_window: int = DYNAMICS_SHIFT_TURNS) -> Dict[str, Any]:
+    """
+    Rolling metrics of how a conversation develops, all computed from prefix
+    sums in O(turns) (O(turns x speakers) for the word shares). df_analysis is
+    not modified. Returns a dictionary with:
+        - 'timeline': per turn, the signed sentiment, its rolling mean, the rolling
+          filler ratio (all speakers), the rolling speaker-change rate and balance index
+        - 'speaker_filler': per turn, the speaker's own rolling filler ratio
+        - 'word_share': long DataFrame of each speaker's rolling share of words
+        - 'shifts': sentiment before and after each speaker change
+    """
+    window = max(1, int(window))
+    shift_window = max(1, int(shift_window))
+    if df_analysis.empty:
+        return {'timeline': pd.DataFrame(), 'speaker_filler': pd.DataFrame(), 'word_share': pd.DataFrame(),
+                'shifts': pd.DataFrame()}
+    sentiment = signed_sentiment(df_analysis)
+    fillers = rolling_sum(df_analysis[COL_FILLER_COUNT].to_numpy(dtype=np.float64), window)
+    words = rolling_sum(df_analysis[COL_TOTAL_WORDS].to_numpy(dtype=np.float64), window)
+    speakers = df_analysis[COL_SPEAKER].to_numpy()
+    changed = np.r_[0.0, (speakers[1:] != speakers[:-1]).astype(np.float64)]
+    balance = turn_taking_balance(df_analysis, window)
+    timeline = pd.DataFrame({
+        COL_TURN_NUM: df_analysis[COL_TURN_NUM].to_numpy(),
+        COL_SPEAKER: speakers,
+        'Signed Sentiment': sentiment,
+        'Rolling Sentiment': rolling_mean(sentiment, window),
+        'Rolling Filler Ratio': _safe_ratio(fillers, words),
+        'Speaker Change Rate': rolling_mean(changed, window),
+        'Balance': balance['balance'],
+    })
+    return {
+        'timeline': timeline,
+        'speaker_filler': speaker_rolling_filler_ratio(df_analysis, window),
+        'word_share': balance['word_share'],
+        'shifts': speaker_change_shifts(df_analysis, sentiment, shift_window),
+    }
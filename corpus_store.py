@@ -0,0 +1,229 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import List, Dict, Any, Iterable, Optional
+from constants import CORPUS_DB_PATH, CORPUS_SEARCH_LIMIT, COL_TRANSCRIPT, COL_TURN_NUM, COL_SPEAKER, COL_DIALOGUE, \
+    COL_SENTIMENT_LABEL, COL_SENTIMENT_SCORE, COL_FILLER_COUNT, COL_TOTAL_WORDS, COL_FILLER_RATIO
+
+# Turn table columns, in the order of the COL_* result row keys they are stored from.
+_TURN_FIELDS = [
+    ('turn_num', COL_TURN_NUM), ('speaker', COL_SPEAKER), ('text', COL_DIALOGUE), ('label', COL_SENTIMENT_LABEL),
+    ('score', COL_SENTIMENT_SCORE), ('filler_count', COL_FILLER_COUNT), ('total_words', COL_TOTAL_WORDS),
+    ('filler_ratio', COL_FILLER_RATIO),
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    id INTEGER PRIMARY KEY, name TEXT, content_hash TEXT UNIQUE, added_at REAL,
+    turns INTEGER, total_words INTEGER, filler_words INTEGER, filler_ratio REAL,
+    positive INTEGER, neutral INTEGER, negative INTEGER);
+CREATE TABLE IF NOT EXISTS turns (
+    id INTEGER PRIMARY KEY, transcript_id INTEGER, turn_num INTEGER, speaker TEXT, text TEXT, label TEXT, score REAL,
+    filler_count INTEGER, total_words INTEGER, filler_ratio REAL);
+CREATE INDEX IF NOT EXISTS turns_transcript ON turns (transcript_id, turn_num);
+CREATE INDEX IF NOT EXISTS turns_speaker_label ON turns (speaker, label);
+CREATE INDEX IF NOT EXISTS turns_label ON turns (label, filler_ratio);
+CREATE VIRTUAL TABLE IF NOT EXISTS turns_fts USING fts5(text, content='turns', content_rowid='id');
+CREATE TABLE IF NOT EXISTS speakers (
+    transcript_id INTEGER, speaker TEXT, turns INTEGER, total_words INTEGER, filler_words INTEGER,
+    filler_ratio REAL, positive INTEGER, neutral INTEGER, negative INTEGER,
+    PRIMARY KEY (transcript_id, speaker));
+CREATE INDEX IF NOT EXISTS transcripts_filler_ratio ON transcripts (filler_ratio);
+"""
+
+def fts_query(text: str) -> str:
+    """
+    Turns free text into an FTS5 query matching turns that contain all its words
+    (a trailing * keeps prefix matching, e.g. 'refund*'); other FTS5 syntax is
+    quoted so user input cannot cause query errors.
+    """
+    terms = []
+    for word in text.split():
+        prefix = word.endswith('*')
+        word = word.rstrip('*')
+        if word:
+            terms.append('"' + word.replace('"', '""') + '"' + ('*' if prefix else ''))
+    return ' '.join(terms)
+
+class CorpusStore:
+    """
+    Persistent SQLite store of analyzed transcripts for search across calls.
+
+    Each transcript's per-turn results (the COL_* result rows) are stored once,
+    keyed by the transcript's content hash, together with an FTS5 full-text index
+    over the turn texts and per-transcript and per-speaker aggregates computed at
+    ingest time, so searches and filters never re-read or re-analyze files.
+    """
+
+    def __init__(self, path: str = CORPUS_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def has_transcript(self, content_hash: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM transcripts WHERE content_hash = ?",
+                                      (content_hash,)).fetchone() is not None
+
+    def add_transcript(self, name: str, content_hash: str, rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        Stores the result rows of one transcript and its aggregates, replacing any
+        transcript with the same content hash. Returns the transcript id.
+        """
+        values = [tuple(row[key] for _, key in _TURN_FIELDS) for row in rows]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                existing = self._conn.execute("SELECT id FROM transcripts WHERE content_hash = ?",
+                                              (content_hash,)).fetchone()
+                if existing is not None:
+                    self._delete(existing['id'])
+                transcript_id = self._conn.execute(
+                    "INSERT INTO transcripts (name, content_hash, added_at) VALUES (?, ?, ?)",
+                    (name, content_hash, time.time())).lastrowid
+                self._conn.executemany(
+                    f"INSERT INTO turns (transcript_id, {', '.join(column for column, _ in _TURN_FIELDS)}) "
+                    f"VALUES ({transcript_id}, {', '.join('?' * len(_TURN_FIELDS))})", values)
+                self._conn.execute("INSERT INTO turns_fts (rowid, text) "
+                                   "SELECT id, text FROM turns WHERE transcript_id = ?", (transcript_id,))
+                self._conn.execute(
+                    "INSERT INTO speakers SELECT transcript_id, speaker, COUNT(*), SUM(total_words), SUM(filler_count), "
+                    "COALESCE(CAST(SUM(filler_count) AS REAL) / NULLIF(SUM(total_words), 0), 0.0), "
+                    "SUM(lower(label) = 'positive'), SUM(lower(label) = 'neutral'), SUM(lower(label) = 'negative') "
+                    "FROM turns WHERE transcript_id = ? GROUP BY speaker", (transcript_id,))
+                self._conn.execute(
+                    "UPDATE transcripts SET (turns, total_words, filler_words, filler_ratio, positive, neutral, negative) = "
+                    "(SELECT COALESCE(SUM(turns), 0), COALESCE(SUM(total_words), 0), COALESCE(SUM(filler_words), 0), "
+                    "COALESCE(CAST(SUM(filler_words) AS REAL) / NULLIF(SUM(total_words), 0), 0.0), "
+                    "COALESCE(SUM(positive), 0), COALESCE(SUM(neutral), 0), COALESCE(SUM(negative), 0) "
+                    "FROM speakers WHERE transcript_id = ?) WHERE id = ?", (transcript_id, transcript_id))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return transcript_id
+
+    def add_dataframe(self, name: str, content_hash: str, df_analysis) -> int:
+        """Stores a results DataFrame (COL_* columns) as returned by analyze_transcript_data."""
+        columns = [
+            (df_analysis[key].astype('float64').round(4) if df_analysis[key].dtype.kind == 'f' else df_analysis[key]).tolist()
+            for _, key in _TURN_FIELDS
+        ]
+        rows = ({key: column[i] for (_, key), column in zip(_TURN_FIELDS, columns)} for i in range(len(df_analysis)))
+        return self.add_transcript(name, content_hash, rows)
+
+    def add_results_file(self, name: str, content_hash: str, path: str) -> int:
+        """Stores a per-turn results file written by batch_analyze (.jsonl or .parquet)."""
+        if path.endswith('.parquet'):
+            import pyarrow.parquet as pq
+            rows = pq.read_table(path).to_pylist()
+        else:
+            with open(path, 'r', encoding='utf-8') as file:
+                rows = [json.loads(line) for line in file if line.strip()]
+        return self.add_transcript(name, content_hash, rows)
+
+    def _delete(self, transcript_id: int) -> None:
+        self._conn.execute("INSERT INTO turns_fts (turns_fts, rowid, text) "
+                           "SELECT 'delete', id, text FROM turns WHERE transcript_id = ?", (transcript_id,))
+        for table, column in (('turns', 'transcript_id'), ('speakers', 'transcript_id'), ('transcripts', 'id')):
+            self._conn.execute(f"DELETE FROM {table} WHERE {column} = ?", (transcript_id,))
+
+    def remove_transcript(self, transcript_id: int) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._delete(transcript_id)
+            self._conn.execute("COMMIT")
+
+    def search_turns(self, text: Optional[str] = None, speaker: Optional[str] = None, label: Optional[str] = None,
+                     min_filler_ratio: Optional[float] = None, min_score: Optional[float] = None,
+                     transcript_id: Optional[int] = None, limit: int = CORPUS_SEARCH_LIMIT) -> List[Dict[str, Any]]:
+        """
+        Turns matching all given filters, as COL_* result rows plus COL_TRANSCRIPT
+        (the transcript name). text is matched through the full-text index (see
+        fts_query); label is compared case-insensitively.
+        """
+        conditions, params = [], []
+        source = "turns"
+        query = fts_query(text or '')
+        if query:
+            source = "turns_fts JOIN turns ON turns.id = turns_fts.rowid"
+            conditions.append("turns_fts MATCH ?")
+            params.append(query)
+        if speaker:
+            conditions.append("turns.speaker = ?")
+            params.append(speaker)
+        if label:
+            conditions.append("turns.label IN (?, ?)")
+            params.extend([label.lower(), label.upper()])
+        if min_filler_ratio is not None:
+            conditions.append("turns.filler_ratio >= ?")
+            params.append(min_filler_ratio)
+        if min_score is not None:
+            conditions.append("turns.score >= ?")
+            params.append(min_score)
+        if transcript_id is not None:
+            conditions.append("turns.transcript_id = ?")
+            params.append(transcript_id)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = (f"SELECT transcripts.name AS transcript, {', '.join('turns.' + column for column, _ in _TURN_FIELDS)} "
+               f"FROM {source} JOIN transcripts ON transcripts.id = turns.transcript_id {where} "
+               f"ORDER BY turns.transcript_id, turns.turn_num LIMIT ?")
+        with self._lock:
+            records = self._conn.execute(sql, params + [limit]).fetchall()
+        return [
+            {COL_TRANSCRIPT: record['transcript'], **{key: record[column] for column, key in _TURN_FIELDS}}
+            for record in records
+        ]
+
+    def transcripts(self, min_filler_ratio: Optional[float] = None, max_filler_ratio: Optional[float] = None,
+                    limit: int = 1000) -> List[Dict[str, Any]]:
+        """Per-transcript aggregates, optionally filtered by overall filler ratio, highest ratio first."""
+        conditions, params = [], []
+        if min_filler_ratio is not None:
+            conditions.append("filler_ratio >= ?")
+            params.append(min_filler_ratio)
+        if max_filler_ratio is not None:
+            conditions.append("filler_ratio <= ?")
+            params.append(max_filler_ratio)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            records = self._conn.execute(
+                f"SELECT id, name, content_hash, added_at, turns, total_words, filler_words, filler_ratio, "
+                f"positive, neutral, negative FROM transcripts {where} ORDER BY filler_ratio DESC LIMIT ?",
+                params + [limit]).fetchall()
+        return [dict(record) for record in records]
+
+    def speaker_stats(self, transcript_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Per-speaker aggregates of one transcript, or summed over the whole corpus."""
+        with self._lock:
+            if transcript_id is not None:
+                records = self._conn.execute(
+                    "SELECT speaker, turns, total_words, filler_words, filler_ratio, positive, neutral, negative "
+                    "FROM speakers WHERE transcript_id = ? ORDER BY speaker", (transcript_id,)).fetchall()
+            else:
+                records = self._conn.execute(
+                    "SELECT speaker, SUM(turns) AS turns, SUM(total_words) AS total_words, "
+                    "SUM(filler_words) AS filler_words, "
+                    "COALESCE(CAST(SUM(filler_words) AS REAL) / NULLIF(SUM(total_words), 0), 0.0) AS filler_ratio, "
+                    "SUM(positive) AS positive, SUM(neutral) AS neutral, SUM(negative) AS negative "
+                    "FROM speakers GROUP BY speaker ORDER BY speaker").fetchall()
+        return [dict(record) for record in records]
+
+    def speakers(self) -> List[str]:
+        with self._lock:
+            return [record[0] for record in self._conn.execute("SELECT DISTINCT speaker FROM speakers ORDER BY speaker")]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            record = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(turns), 0), COALESCE(SUM(total_words), 0) FROM transcripts").fetchone()
+        return {'transcripts': record[0], 'turns': record[1], 'words': record[2]}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,79 @@
+import io
+from importlib.util import find_spec
+from typing import Dict, Iterator, List, Tuple
+import pandas as pd
+from constants import EXPORT_CHUNK_ROWS
+
+EXCEL_MAX_ROWS = 1_048_576
+
+# Format -> (file extension, MIME type, module that must be importable).
+EXPORT_FORMATS: Dict[str, Tuple[str, str, str]] = {
+    'CSV': ('csv', 'text/csv', 'pandas'),
+    'Parquet': ('parquet', 'application/octet-stream', 'pyarrow'),
+    'Excel': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'openpyxl'),
+}
+
+def available_export_formats() -> List[str]:
+    """Export formats whose writer library is installed (Parquet needs pyarrow, Excel needs openpyxl)."""
+    return [name for name, (_, _, module) in EXPORT_FORMATS.items() if find_spec(module) is not None]
+
+def iter_row_chunks(df: pd.DataFrame, chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Consecutive row slices of df (views, not copies) of at most chunk_rows rows."""
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+def iter_csv_chunks(df: pd.DataFrame, chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """Encodes df as UTF-8 CSV one chunk of rows at a time (the header goes with the first chunk)."""
+    for i, chunk in enumerate(iter_row_chunks(df, chunk_rows)):
+        yield chunk.to_csv(index=False, header=i == 0).encode('utf-8')
+
+def write_csv(df: pd.DataFrame, file: io.BufferedIOBase, chunk_rows: int = EXPORT_CHUNK_ROWS) -> None:
+    for data in iter_csv_chunks(df, chunk_rows):
+        file.write(data)
+
+def write_parquet(df: pd.DataFrame, file: io.BufferedIOBase, chunk_rows: int = EXPORT_CHUNK_ROWS) -> None:
+    """Writes df as Parquet with one row group per chunk, converting one chunk to Arrow at a time."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(file, schema) as writer:
+        for chunk in iter_row_chunks(df, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+def write_excel(df: pd.DataFrame, file: io.BufferedIOBase, chunk_rows: int = EXPORT_CHUNK_ROWS,
+                sheet_name: str = 'Results') -> None:
+    """
+    Writes df to one Excel sheet through a write-only openpyxl workbook, which
+    streams appended rows to a temporary file instead of keeping cells in
+    memory; rows are converted one chunk at a time (missing values become
+    empty cells). Raises ValueError beyond Excel's row limit.
+    """
+    from openpyxl import Workbook
+    if len(df) + 1 > EXCEL_MAX_ROWS:
+        raise ValueError(f"{len(df):,} rows exceed Excel's limit of {EXCEL_MAX_ROWS - 1:,}; export CSV or Parquet instead.")
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    sheet.append([str(column) for column in df.columns])
+    for chunk in iter_row_chunks(df, chunk_rows):
+        values = chunk.astype(object).where(chunk.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            sheet.append(row)
+    workbook.save(file)
+
+_WRITERS = {'CSV': write_csv, 'Parquet': write_parquet, 'Excel': write_excel}
+
+def export_bytes(df: pd.DataFrame, export_format: str, chunk_rows: int = EXPORT_CHUNK_ROWS) -> bytes:
+    """
+    Serializes df in export_format ('CSV', 'Parquet' or 'Excel'). Rows are
+    encoded chunk by chunk into one output buffer, so besides the result only
+    one chunk's intermediate text or Arrow table is held at a time.
+    """
+    buffer = io.BytesIO()
+    _WRITERS[export_format](df, buffer, chunk_rows)
+    return buffer.getvalue()
+
+def export_file_name(stem: str, export_format: str) -> str:
+    return f"{stem}.{EXPORT_FORMATS[export_format][0]}"
+
+def export_mime_type(export_format: str) -> str:
+    return EXPORT_FORMATS[export_format][1]
@@ -0,0 +1,35 @@
+import re
+from typing import Iterable, Dict, Any
+from constants import FILLER_WORDS
+
+def compile_filler_pattern(filler_words: Iterable[str]) -> "re.Pattern[str]":
+    """
+    Builds one case-insensitive alternation matching any of the filler words or phrases.
+    Longer fillers are tried first so multi-word phrases win over their prefixes.
+    """
+    alternation = '|'.join(re.escape(filler) for filler in sorted(filler_words, key=len, reverse=True))
+    return re.compile(r'\b(?:' + alternation + r')\b', re.IGNORECASE)
+
+FILLER_PATTERN = compile_filler_pattern(FILLER_WORDS)
+
+def count_filler_words(text: str, pattern: "re.Pattern[str]" = FILLER_PATTERN) -> int:
+    """Counts filler occurrences in a single scan of the text."""
+    return len(pattern.findall(text))
+
+def find_filler_words(text: str, pattern: "re.Pattern[str]" = FILLER_PATTERN) -> Dict[str, Any]:
+    """
+    Finds all filler occurrences in a single scan of the text, for callers that
+    need their positions. The analysis pipeline only counts fillers (see
+    count_filler_words); its results carry no spans.
+    Returns a dictionary with:
+        - count: total number of fillers
+        - counts: occurrences per (lower-cased) filler
+        - spans: (start, end, filler) character offsets into the original text
+    """
+    counts: Dict[str, int] = {}
+    spans = []
+    for match in pattern.finditer(text):
+        filler = match.group(0).lower()
+        counts[filler] = counts.get(filler, 0) + 1
+        spans.append((match.start(), match.end(), filler))
+    return {'count': len(spans), 'counts': counts, 'spans': spans}
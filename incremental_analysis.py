@@ -0,0 +1,100 @@
+import codecs
+import os
+from typing import List, Any
+from analysis_utils import Turn, TurnAssembler, analyze_turn_results
+from result_columns import AnalysisColumns
+
+ANCHOR_BYTES = 64
+
+class IncrementalTranscriptAnalyzer:
+    """
+    Keeps the analysis of a growing transcript file (e.g. a live call) up to date.
+
+    The analyzer remembers the byte offset of the last complete line it parsed and
+    the parser state (the still-open speaker turn). Each update reads only the bytes
+    appended since then: turns closed by the new lines are analyzed once and appended
+    to the results, while the open tail turn is re-analyzed on every update because
+    it may still grow. If the file shrinks or its already-parsed content changes,
+    the analyzer starts over from the beginning.
+
+    Results are kept in an AnalysisColumns store: completed turns are appended
+    once, and the tail rows are overwritten in place on each update.
+    """
+
+    def __init__(self, file_path: str, **analysis_options: Any):
+        self.file_path = file_path
+        self.analysis_options = analysis_options
+        self.reset()
+
+    def reset(self) -> None:
+        self.offset = 0
+        self.assembler = TurnAssembler()
+        self.columns = AnalysisColumns()
+        self.num_final = 0
+        self._anchor = b''
+        self._size = -1
+
+    def _anchor_matches(self, file) -> bool:
+        if not self._anchor:
+            return True
+        file.seek(self.offset - len(self._anchor))
+        return file.read(len(self._anchor)) == self._anchor
+
+    def update(self) -> bool:
+        """Parses and analyzes whatever was appended since the last update. Returns True if results changed."""
+        size = os.path.getsize(self.file_path)
+        with open(self.file_path, 'rb') as file:
+            if size < self.offset or not self._anchor_matches(file):
+                self.reset()
+            if size == self._size:
+                return False
+            file.seek(self.offset)
+            data = file.read()
+        self._size = size
+        if self.offset == 0 and data.startswith(codecs.BOM_UTF8):
+            # Like the 'utf-8-sig' reads elsewhere, skip a byte order mark at the start of the file.
+            self.offset = len(codecs.BOM_UTF8)
+            data = data[self.offset:]
+
+        # Only complete lines advance the parser; a trailing partial line is parsed
+        # provisionally into the tail and read again on the next update.
+        end = data.rfind(b'\n') + 1
+        new_turns = []
+        for line in data[:end].decode('utf-8').split('\n'):
+            turn = self.assembler.feed(line)
+            if turn is not None:
+                new_turns.append(turn)
+        if end:
+            self.offset += end
+            self._anchor = data[max(0, end - ANCHOR_BYTES):end]
+
+        tail_assembler = self.assembler.copy()
+        tail_turns = []
+        partial_line = codecs.getincrementaldecoder('utf-8')().decode(data[end:], final=False)
+        turn = tail_assembler.feed(partial_line)
+        if turn is not None:
+            tail_turns.append(turn)
+        turn = tail_assembler.open_turn()
+        if turn is not None:
+            tail_turns.append(turn)
+
+        self.columns.truncate(self.num_final)
+        if new_turns:
+            self.columns.extend(new_turns, analyze_turn_results(new_turns, **self.analysis_options))
+            self.num_final += len(new_turns)
+        if tail_turns:
+            self.columns.extend(tail_turns, analyze_turn_results(tail_turns, **self.analysis_options))
+        return True
+
+    def dataframe(self):
+        """
+        Results DataFrame: the completed turns followed by the provisional tail.
+        It shares memory with the column store, so use it before the next update.
+        """
+        return self.columns.to_dataframe()
+
+    def turns(self) -> List[Turn]:
+        """The parsed turns, as returned by parse_transcript."""
+        columns = self.columns
+        return [Turn(int(columns.turn_num[i]), columns.speakers[columns.speaker_code[i]], columns.text[i])
+                for i in range(len(columns))]
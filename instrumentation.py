@@ -0,0 +1,152 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+class PerfRecorder:
+    """
+    Thread-safe collector of pipeline performance metrics:
+        - per-stage call counts, wall time and CPU time
+        - latency histograms (e.g. per-turn analysis latency)
+        - counters (e.g. cache hits and misses)
+        - model load times
+        - error counts by stage and exception type
+    CPU time is process CPU time, so concurrent work on other threads (including
+    model intra-op threads) is attributed to the stage that is running.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages: Dict[str, Dict[str, float]] = {}
+            self._histograms: Dict[str, Dict[str, Any]] = {}
+            self._counters: Dict[str, float] = {}
+            self._model_load_s: Dict[str, float] = {}
+            self._errors: Dict[str, Dict[str, int]] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Times the enclosed block as one call of the named stage."""
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            self.add_stage_time(name, time.perf_counter() - wall_start, time.process_time() - cpu_start)
+
+    def add_stage_time(self, name: str, wall_s: float, cpu_s: float, calls: int = 1) -> None:
+        with self._lock:
+            stage = self._stages.setdefault(name, {'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0})
+            stage['calls'] += calls
+            stage['wall_s'] += wall_s
+            stage['cpu_s'] += cpu_s
+
+    def observe(self, name: str, value: float, count: int = 1) -> None:
+        """Adds count observations of value to the named latency histogram."""
+        with self._lock:
+            histogram = self._histograms.setdefault(name, {
+                'buckets': list(LATENCY_BUCKETS), 'counts': [0] * (len(LATENCY_BUCKETS) + 1), 'sum': 0.0, 'count': 0
+            })
+            histogram['counts'][bisect_left(LATENCY_BUCKETS, value)] += count
+            histogram['sum'] += value * count
+            histogram['count'] += count
+
+    def increment(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def record_model_load(self, model: str, seconds: float) -> None:
+        with self._lock:
+            self._model_load_s[model] = seconds
+
+    def record_error(self, stage: str, error: BaseException) -> None:
+        with self._lock:
+            by_type = self._errors.setdefault(stage, {})
+            error_type = type(error).__name__
+            by_type[error_type] = by_type.get(error_type, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """A JSON-serializable copy of all metrics."""
+        with self._lock:
+            return json.loads(json.dumps({
+                'stages': self._stages,
+                'histograms': self._histograms,
+                'counters': self._counters,
+                'model_load_s': self._model_load_s,
+                'errors': self._errors,
+            }))
+
+    def merge(self, snapshot: Dict[str, Any]) -> None:
+        """Adds a snapshot (e.g. from a worker process) into this recorder."""
+        for name, stage in snapshot.get('stages', {}).items():
+            self.add_stage_time(name, stage['wall_s'], stage['cpu_s'], stage['calls'])
+        with self._lock:
+            for name, other in snapshot.get('histograms', {}).items():
+                histogram = self._histograms.setdefault(name, {
+                    'buckets': list(other['buckets']), 'counts': [0] * len(other['counts']), 'sum': 0.0, 'count': 0
+                })
+                histogram['counts'] = [a + b for a, b in zip(histogram['counts'], other['counts'])]
+                histogram['sum'] += other['sum']
+                histogram['count'] += other['count']
+            for name, value in snapshot.get('counters', {}).items():
+                self._counters[name] = self._counters.get(name, 0) + value
+            for model, seconds in snapshot.get('model_load_s', {}).items():
+                self._model_load_s[model] = max(seconds, self._model_load_s.get(model, 0.0))
+            for stage, by_type in snapshot.get('errors', {}).items():
+                target = self._errors.setdefault(stage, {})
+                for error_type, count in by_type.items():
+                    target[error_type] = target.get(error_type, 0) + count
+
+    def cache_hit_rate(self) -> Optional[float]:
+        with self._lock:
+            hits = self._counters.get('cache_hits', 0)
+            lookups = hits + self._counters.get('cache_misses', 0)
+        return (hits / lookups) if lookups > 0 else None
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self, prefix: str = "speech_analysis") -> str:
+        """Renders all metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines: List[str] = []
+
+        def add(name: str, metric_type: str, samples: List[str]) -> None:
+            if samples:
+                lines.append(f"# TYPE {prefix}_{name} {metric_type}")
+                lines.extend(samples)
+
+        stages = snapshot['stages']
+        add('stage_calls_total', 'counter',
+            [f'{prefix}_stage_calls_total{{stage="{name}"}} {s["calls"]}' for name, s in stages.items()])
+        add('stage_wall_seconds_total', 'counter',
+            [f'{prefix}_stage_wall_seconds_total{{stage="{name}"}} {s["wall_s"]:.6f}' for name, s in stages.items()])
+        add('stage_cpu_seconds_total', 'counter',
+            [f'{prefix}_stage_cpu_seconds_total{{stage="{name}"}} {s["cpu_s"]:.6f}' for name, s in stages.items()])
+        for name, histogram in snapshot['histograms'].items():
+            samples = []
+            cumulative = 0
+            for bound, count in zip(histogram['buckets'] + ['+Inf'], histogram['counts']):
+                cumulative += count
+                samples.append(f'{prefix}_{name}_bucket{{le="{bound}"}} {cumulative}')
+            samples.append(f'{prefix}_{name}_sum {histogram["sum"]:.6f}')
+            samples.append(f'{prefix}_{name}_count {histogram["count"]}')
+            add(name, 'histogram', samples)
+        for name, value in snapshot['counters'].items():
+            add(f'{name}_total', 'counter', [f'{prefix}_{name}_total {value}'])
+        add('model_load_seconds', 'gauge',
+            [f'{prefix}_model_load_seconds{{model="{model}"}} {seconds:.6f}'
+             for model, seconds in snapshot['model_load_s'].items()])
+        add('errors_total', 'counter',
+            [f'{prefix}_errors_total{{stage="{stage}",type="{error_type}"}} {count}'
+             for stage, by_type in snapshot['errors'].items() for error_type, count in by_type.items()])
+        return '\n'.join(lines) + '\n'
+
+recorder = PerfRecorder()
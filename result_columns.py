@@ -0,0 +1,102 @@
+from typing import List, Dict, Any, Iterable
+import numpy as np
+from constants import COL_TURN_NUM, COL_SPEAKER, COL_DIALOGUE, COL_SENTIMENT_LABEL, COL_SENTIMENT_SCORE, \
+    COL_FILLER_COUNT, COL_TOTAL_WORDS, COL_FILLER_RATIO
+
+class AnalysisColumns:
+    """
+    Typed, growable column store for per-turn analysis results.
+
+    Results are written straight into preallocated NumPy arrays (capacity doubles
+    when full): turn numbers and counts as int32, scores and ratios as float32, and
+    speaker and sentiment label as integer codes into small category lists. Texts
+    are kept in an object array referencing the turn strings, not copies of them.
+    to_dataframe() wraps the filled part of the arrays without copying them.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        capacity = max(1, capacity)
+        self.size = 0
+        self.speakers: List[str] = []
+        self.labels: List[str] = []
+        self._speaker_codes: Dict[str, int] = {}
+        self._label_codes: Dict[str, int] = {}
+        self.turn_num = np.empty(capacity, dtype=np.int32)
+        self.speaker_code = np.empty(capacity, dtype=np.int32)
+        self.text = np.empty(capacity, dtype=object)
+        self.label_code = np.empty(capacity, dtype=np.int32)
+        self.score = np.empty(capacity, dtype=np.float32)
+        self.filler_count = np.empty(capacity, dtype=np.int32)
+        self.total_words = np.empty(capacity, dtype=np.int32)
+        self.filler_ratio = np.empty(capacity, dtype=np.float32)
+
+    _ARRAYS = ('turn_num', 'speaker_code', 'text', 'label_code', 'score', 'filler_count', 'total_words', 'filler_ratio')
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _reserve(self, needed: int) -> None:
+        capacity = len(self.turn_num)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in self._ARRAYS:
+            old = getattr(self, name)
+            grown = np.empty(capacity, dtype=old.dtype)
+            grown[:self.size] = old[:self.size]
+            setattr(self, name, grown)
+
+    @staticmethod
+    def _code(value: str, codes: Dict[str, int], categories: List[str]) -> int:
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(categories)
+            categories.append(value)
+        return code
+
+    def extend(self, turns: Iterable[Any], results: Iterable[Dict[str, Any]]) -> None:
+        """
+        Appends parsed turns (objects with id, speaker and text) and their analysis
+        results (dictionaries with 'label', 'score', 'count', 'total_words', 'ratio').
+        """
+        turns = list(turns)
+        self._reserve(self.size + len(turns))
+        i = self.size
+        for turn, result in zip(turns, results):
+            self.turn_num[i] = turn.id
+            self.speaker_code[i] = self._code(turn.speaker, self._speaker_codes, self.speakers)
+            self.text[i] = turn.text
+            self.label_code[i] = self._code(result['label'], self._label_codes, self.labels)
+            self.score[i] = result['score']
+            self.filler_count[i] = result['count']
+            self.total_words[i] = result['total_words']
+            self.filler_ratio[i] = result['ratio']
+            i += 1
+        self.size = i
+
+    def truncate(self, size: int) -> None:
+        """Drops all rows from position size onwards (the storage is reused by later appends)."""
+        self.size = min(self.size, size)
+
+    def to_dataframe(self):
+        """
+        Builds a DataFrame over the filled part of the arrays. Numeric and text
+        columns are views, so rows appended to or truncated from this store
+        afterwards may show through; copy the frame if it must outlive changes.
+        Categories only seen in truncated rows are dropped.
+        """
+        import pandas as pd
+        n = self.size
+        speakers = pd.Categorical.from_codes(self.speaker_code[:n], categories=self.speakers)
+        labels = pd.Categorical.from_codes(self.label_code[:n], categories=self.labels)
+        return pd.DataFrame({
+            COL_TURN_NUM: self.turn_num[:n],
+            COL_SPEAKER: speakers.remove_unused_categories(),
+            COL_DIALOGUE: self.text[:n],
+            COL_SENTIMENT_LABEL: labels.remove_unused_categories(),
+            COL_SENTIMENT_SCORE: self.score[:n],
+            COL_FILLER_COUNT: self.filler_count[:n],
+            COL_TOTAL_WORDS: self.total_words[:n],
+            COL_FILLER_RATIO: self.filler_ratio[:n],
+        }, copy=False)
@@ -0,0 +1,67 @@
+from typing import List, Any
+import numpy as np
+import pandas as pd
+from analysis_utils import split_sentences, calculate_sentiment_batch
+from conversation_dynamics import signed_sentiment
+from summary_metrics import normalized_labels, SENTIMENT_CLASSES
+from instrumentation import recorder
+from constants import SENTIMENT_BATCH_SIZE, SPACY_BATCH_SIZE, COL_TURN_NUM, COL_SPEAKER, COL_SENTENCE_NUM, \
+    COL_SENTENCE, COL_SENTIMENT_LABEL, COL_SENTIMENT_SCORE
+
+def analyze_sentences(turns: List[Any], sentiment_batch_size: int = SENTIMENT_BATCH_SIZE,
+                      spacy_batch_size: int = SPACY_BATCH_SIZE) -> pd.DataFrame:
+    """
+    Sentence-level sentiment for parsed turns (objects with id, speaker and text).
+    All turns are split into sentences first, then every sentence of the
+    transcript goes through calculate_sentiment_batch in one call, so sentences
+    of different turns share length-sorted model batches. Returns one row per
+    sentence: COL_TURN_NUM, COL_SPEAKER, COL_SENTENCE_NUM (1-based within the
+    turn), COL_SENTENCE, COL_SENTIMENT_LABEL and COL_SENTIMENT_SCORE.
+    """
+    texts = [turn.text for turn in turns]
+    with recorder.stage('sentences'):
+        spans = split_sentences(texts, spacy_batch_size)
+    counts = np.fromiter((len(turn_spans) for turn_spans in spans), dtype=np.int64, count=len(spans))
+    sentences = [text[start:end] for text, turn_spans in zip(texts, spans) for start, end in turn_spans]
+    with recorder.stage('sentence_sentiment'):
+        results = calculate_sentiment_batch(sentences, sentiment_batch_size)
+    recorder.increment('sentences_analyzed', len(sentences))
+    offsets = np.repeat(np.cumsum(counts) - counts, counts)
+    return pd.DataFrame({
+        COL_TURN_NUM: np.repeat(np.fromiter((turn.id for turn in turns), dtype=np.int32, count=len(turns)), counts),
+        COL_SPEAKER: pd.Categorical(np.repeat(np.array([turn.speaker for turn in turns], dtype=object), counts)),
+        COL_SENTENCE_NUM: (np.arange(len(sentences)) - offsets + 1).astype(np.int32),
+        COL_SENTENCE: sentences,
+        COL_SENTIMENT_LABEL: pd.Categorical([result['label'] for result in results]),
+        COL_SENTIMENT_SCORE: np.fromiter((result['score'] for result in results), dtype=np.float32,
+                                         count=len(results)),
+    })
+
+def sentence_rollup(df_sentences: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rolls sentence results up to their turns with one bincount per measure:
+    sentence count, positive / neutral / negative sentence counts, the mean
+    signed sentiment of the sentences (see conversation_dynamics.signed_sentiment)
+    and whether the turn is mixed (has both positive and negative sentences).
+    """
+    if df_sentences.empty:
+        return pd.DataFrame(columns=[COL_TURN_NUM, 'Sentences', 'Positive', 'Neutral', 'Negative',
+                                     'Mean Sentiment', 'Mixed'])
+    turns, turn_index = np.unique(df_sentences[COL_TURN_NUM].to_numpy(), return_inverse=True)
+    sentences = np.bincount(turn_index, minlength=len(turns))
+    labels = normalized_labels(df_sentences[COL_SENTIMENT_LABEL])
+    class_codes = pd.Index(labels.categories).get_indexer(SENTIMENT_CLASSES)
+    label_counts = {
+        label.capitalize(): np.bincount(turn_index[labels.codes == code], minlength=len(turns)) if code >= 0
+        else np.zeros(len(turns), dtype=np.int64)
+        for label, code in zip(SENTIMENT_CLASSES, class_codes)
+    }
+    signed_sums = np.bincount(turn_index, weights=signed_sentiment(df_sentences), minlength=len(turns))
+    rollup = pd.DataFrame({
+        COL_TURN_NUM: turns,
+        'Sentences': sentences,
+        **label_counts,
+        'Mean Sentiment': np.round(signed_sums / sentences, 4),
+    })
+    rollup['Mixed'] = (rollup['Positive'] > 0) & (rollup['Negative'] > 0)
+    return rollup
@@ -0,0 +1,124 @@
+import logging
+import os
+import platform
+import shutil
+from typing import Any, Optional
+from instrumentation import recorder
+from constants import SENTIMENT_MODEL_NAME, SENTIMENT_MODEL_REVISION, SENTIMENT_BACKEND, SENTIMENT_ONNX_QUANTIZE, \
+    SENTIMENT_ONNX_DIR, SENTIMENT_INTRA_OP_THREADS
+
+logger = logging.getLogger(__name__)
+
+SENTIMENT_BACKENDS = ('transformers', 'onnx')
+ONNX_FILE_NAME = "model.onnx"
+ONNX_INT8_FILE_NAME = "model_quantized.onnx"
+
+_loaded_backend_id: Optional[str] = None
+
+def sentiment_backend_id(backend: str = SENTIMENT_BACKEND, quantize: bool = SENTIMENT_ONNX_QUANTIZE) -> str:
+    """Short name of a backend configuration: 'transformers', 'onnx' or 'onnx-int8'."""
+    if backend == 'onnx' and quantize:
+        return 'onnx-int8'
+    return backend
+
+def loaded_sentiment_backend_id() -> Optional[str]:
+    """sentiment_backend_id of the backend load_sentiment_pipeline actually loaded (after any fallback), or None."""
+    return _loaded_backend_id
+
+def set_loaded_sentiment_backend_id(backend_id: str) -> None:
+    """Records the backend of a sentiment model loaded outside load_sentiment_pipeline (e.g. 'custom')."""
+    global _loaded_backend_id
+    _loaded_backend_id = backend_id
+
+def onnx_model_dir(quantize: bool) -> str:
+    model_name = SENTIMENT_MODEL_NAME.replace('/', '--')
+    return os.path.join(SENTIMENT_ONNX_DIR, f"{model_name}@{SENTIMENT_MODEL_REVISION}" + ("-int8" if quantize else ""))
+
+def _publish_dir(tmp_dir: str, target_dir: str) -> None:
+    """Moves a finished export into place; if another process got there first, keeps theirs."""
+    try:
+        os.replace(tmp_dir, target_dir)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def export_onnx_model(quantize: bool = SENTIMENT_ONNX_QUANTIZE) -> str:
+    """
+    Exports the sentiment model to ONNX under SENTIMENT_ONNX_DIR and, if quantize
+    is set, also writes a copy with dynamically quantized int8 weights. Exports
+    are reused by later calls. Returns the directory of the requested model.
+    """
+    from transformers import AutoTokenizer
+    fp32_dir = onnx_model_dir(False)
+    if not os.path.exists(os.path.join(fp32_dir, ONNX_FILE_NAME)):
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+        tmp_dir = f"{fp32_dir}.tmp-{os.getpid()}"
+        model = ORTModelForSequenceClassification.from_pretrained(SENTIMENT_MODEL_NAME,
+                                                                  revision=SENTIMENT_MODEL_REVISION, export=True)
+        model.save_pretrained(tmp_dir)
+        AutoTokenizer.from_pretrained(SENTIMENT_MODEL_NAME, revision=SENTIMENT_MODEL_REVISION).save_pretrained(tmp_dir)
+        _publish_dir(tmp_dir, fp32_dir)
+    if not quantize:
+        return fp32_dir
+    int8_dir = onnx_model_dir(True)
+    if not os.path.exists(os.path.join(int8_dir, ONNX_INT8_FILE_NAME)):
+        from optimum.onnxruntime import ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        tmp_dir = f"{int8_dir}.tmp-{os.getpid()}"
+        if platform.machine().lower() in ('arm64', 'aarch64'):
+            config = AutoQuantizationConfig.arm64(is_static=False, per_channel=False)
+        else:
+            config = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+        ORTQuantizer.from_pretrained(fp32_dir, file_name=ONNX_FILE_NAME).quantize(save_dir=tmp_dir,
+                                                                                 quantization_config=config)
+        AutoTokenizer.from_pretrained(fp32_dir).save_pretrained(tmp_dir)
+        _publish_dir(tmp_dir, int8_dir)
+    return int8_dir
+
+def load_transformers_pipeline(intra_op_threads: int = SENTIMENT_INTRA_OP_THREADS):
+    """The Hugging Face PyTorch pipeline (fp32)."""
+    from transformers import pipeline
+    if intra_op_threads > 0:
+        import torch
+        torch.set_num_threads(intra_op_threads)
+    return pipeline(task="sentiment-analysis", model=SENTIMENT_MODEL_NAME, revision=SENTIMENT_MODEL_REVISION)
+
+def load_onnx_pipeline(quantize: bool = SENTIMENT_ONNX_QUANTIZE, intra_op_threads: int = SENTIMENT_INTRA_OP_THREADS):
+    """
+    A transformers pipeline running the exported ONNX model on the ONNX Runtime
+    CPU provider, so it has the same call interface and outputs as the PyTorch one.
+    """
+    import onnxruntime
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    from transformers import AutoTokenizer, pipeline
+    model_dir = export_onnx_model(quantize)
+    session_options = onnxruntime.SessionOptions()
+    session_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if intra_op_threads > 0:
+        session_options.intra_op_num_threads = intra_op_threads
+    model = ORTModelForSequenceClassification.from_pretrained(
+        model_dir, file_name=ONNX_INT8_FILE_NAME if quantize else ONNX_FILE_NAME,
+        provider="CPUExecutionProvider", session_options=session_options)
+    return pipeline(task="sentiment-analysis", model=model, tokenizer=AutoTokenizer.from_pretrained(model_dir))
+
+def load_sentiment_pipeline(backend: str = SENTIMENT_BACKEND, quantize: bool = SENTIMENT_ONNX_QUANTIZE,
+                            intra_op_threads: int = SENTIMENT_INTRA_OP_THREADS) -> Any:
+    """
+    Loads the sentiment pipeline for the configured backend. If the ONNX backend
+    cannot be loaded (e.g. optimum/onnxruntime are not installed), the error is
+    logged and recorded and the transformers pipeline is used instead; see
+    loaded_sentiment_backend_id for the backend that ended up loaded.
+    """
+    global _loaded_backend_id
+    if backend not in SENTIMENT_BACKENDS:
+        raise ValueError(f"Unknown sentiment backend {backend!r}; expected one of {SENTIMENT_BACKENDS}")
+    if backend == 'onnx':
+        try:
+            model = load_onnx_pipeline(quantize, intra_op_threads)
+            _loaded_backend_id = sentiment_backend_id(backend, quantize)
+            return model
+        except Exception as e:
+            recorder.record_error('model_load', e)
+            logger.warning("ONNX Runtime sentiment backend unavailable (%s); falling back to transformers.", e)
+    model = load_transformers_pipeline(intra_op_threads)
+    _loaded_backend_id = sentiment_backend_id('transformers')
+    return model
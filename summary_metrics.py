@@ -0,0 +1,124 @@
+import hashlib
+from typing import Dict, Any, List, Tuple
+import numpy as np
+import pandas as pd
+from constants import COL_SPEAKER, COL_SENTIMENT_LABEL, COL_FILLER_COUNT, COL_TOTAL_WORDS
+
+SENTIMENT_CLASSES = ['positive', 'neutral', 'negative']
+CONTENT_HASH_ATTR = 'content_hash'
+WORD_COUNT_EDGES = [10, 20, 30, 50, 100]
+
+def results_content_hash(df_analysis: pd.DataFrame) -> str:
+    """
+    Hash of a results DataFrame's column names and values, computed with
+    pandas' vectorized row hashing. The hash is remembered in
+    df_analysis.attrs together with the frame's id and length, and only reused
+    when both still match: pandas copies attrs to derived frames (filters,
+    copies), which have their own id and so are hashed afresh. Frames whose
+    values are changed in place after the first call keep their old hash.
+    """
+    memo = df_analysis.attrs.get(CONTENT_HASH_ATTR)
+    if memo is not None and memo[0] == id(df_analysis) and memo[1] == len(df_analysis):
+        return memo[2]
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update('\x1f'.join(map(str, df_analysis.columns)).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df_analysis, index=False).to_numpy().tobytes())
+    content_hash = digest.hexdigest()
+    df_analysis.attrs[CONTENT_HASH_ATTR] = (id(df_analysis), len(df_analysis), content_hash)
+    return content_hash
+
+def normalized_labels(labels: pd.Series) -> pd.Categorical:
+    """
+    Sentiment labels as a lower-case Categorical ('POSITIVE' and 'positive'
+    become one category). Only the categories are lower-cased; rows are remapped
+    through their integer codes.
+    """
+    labels = labels.astype('category')
+    lowered = labels.cat.categories.astype(str).str.lower()
+    categories = pd.Index(lowered.unique())
+    remap = np.append(categories.get_indexer(lowered), -1)
+    return pd.Categorical.from_codes(remap[labels.cat.codes.to_numpy()], categories=categories)
+
+def word_count_bins(max_words: int) -> Tuple[List[int], List[str]]:
+    """
+    Bin edges and labels for the word-count distribution: the WORD_COUNT_EDGES
+    below the longest turn, then one last bin up to max_words.
+    """
+    bins, labels, lower = [0], [], 1
+    for edge in WORD_COUNT_EDGES:
+        if edge >= max_words:
+            break
+        bins.append(edge)
+        labels.append(f'{lower}-{edge}')
+        lower = edge + 1
+    bins.append(max_words + 1)
+    labels.append(f'{lower}-{max_words}')
+    return bins, labels
+
+def speaker_summary(df_analysis: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-speaker turns, word and filler totals and sentiment counts: one grouped sum
+    for the numeric columns and one crosstab of speaker against normalized label.
+    """
+    speakers = df_analysis[COL_SPEAKER]
+    totals = df_analysis[[COL_TOTAL_WORDS, COL_FILLER_COUNT]].astype(np.int64).groupby(speakers, observed=True).agg('sum')
+    turns = speakers.value_counts(sort=False).reindex(totals.index)
+    sentiment = pd.crosstab(speakers.to_numpy(), normalized_labels(df_analysis[COL_SENTIMENT_LABEL]))
+    sentiment = sentiment.reindex(index=totals.index, columns=SENTIMENT_CLASSES, fill_value=0)
+    summary = pd.DataFrame({
+        COL_SPEAKER: totals.index,
+        'Turns': turns.to_numpy(),
+        'Total_Words': totals[COL_TOTAL_WORDS].to_numpy(),
+        'Total_Filler_Words': totals[COL_FILLER_COUNT].to_numpy(),
+        'Positive_Turns': sentiment['positive'].to_numpy(),
+        'Neutral_Turns': sentiment['neutral'].to_numpy(),
+        'Negative_Turns': sentiment['negative'].to_numpy(),
+    })
+    summary['Avg_Words_Turn'] = (summary['Total_Words'] / summary['Turns']).round(1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = summary['Total_Filler_Words'] / summary['Total_Words']
+    summary['Filler_Ratio'] = ratio.where(summary['Total_Words'] > 0, 0.0)
+    return summary
+
+def summarize_results(df_analysis: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Computes the corpus-level and per-speaker metrics shown in the summary tab.
+    df_analysis is not modified. Returns a dictionary with:
+        - 'num_turns', 'total_words', 'filler_words', 'avg_words_turn', 'avg_filler_ratio'
+        - 'min_words', 'max_words', 'median_words', 'avg_words' (words per turn)
+        - 'speakers': per-speaker DataFrame (see speaker_summary)
+        - 'sentiment_counts': DataFrame of [COL_SENTIMENT_LABEL, 'Count'], most frequent first
+        - 'word_count_distribution': DataFrame of ['Word Count Range', 'Number of Turns']
+    """
+    num_turns = len(df_analysis)
+    words = df_analysis[COL_TOTAL_WORDS].to_numpy(dtype=np.int64)
+    total_words = int(words.sum())
+    filler_words = int(df_analysis[COL_FILLER_COUNT].to_numpy(dtype=np.int64).sum())
+    summary: Dict[str, Any] = {
+        'num_turns': num_turns,
+        'total_words': total_words,
+        'filler_words': filler_words,
+        'avg_words_turn': total_words / num_turns if num_turns > 0 else 0,
+        'avg_filler_ratio': filler_words / total_words if total_words > 0 else 0,
+    }
+    if num_turns == 0:
+        summary.update(min_words=0, max_words=0, median_words=0.0, avg_words=0.0, speakers=pd.DataFrame(),
+                       sentiment_counts=pd.DataFrame(columns=[COL_SENTIMENT_LABEL, 'Count']),
+                       word_count_distribution=pd.DataFrame(columns=['Word Count Range', 'Number of Turns']))
+        return summary
+    max_words = int(words.max())
+    summary.update(min_words=int(words.min()), max_words=max_words,
+                   median_words=float(np.median(words)), avg_words=float(words.mean()))
+    summary['speakers'] = speaker_summary(df_analysis)
+
+    sentiment_counts = df_analysis[COL_SENTIMENT_LABEL].value_counts()
+    sentiment_counts = sentiment_counts[sentiment_counts > 0].reset_index()
+    sentiment_counts.columns = [COL_SENTIMENT_LABEL, 'Count']
+    summary['sentiment_counts'] = sentiment_counts
+
+    bins, labels = word_count_bins(max_words)
+    ranges = pd.cut(words, bins=bins, labels=labels, right=True, include_lowest=True)
+    word_count_dist = pd.Series(ranges).value_counts(sort=False).reset_index()
+    word_count_dist.columns = ['Word Count Range', 'Number of Turns']
+    summary['word_count_distribution'] = word_count_dist
+    return summary
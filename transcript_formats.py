@@ -0,0 +1,335 @@
+import json
+import os
+import re
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple, Callable
+from analysis_utils import Turn
+
+UNKNOWN_SPEAKER = "Unknown"
+
+# A timed segment as produced by the format parsers: (speaker or None, start, end, text).
+# A segment without a speaker continues the previous speaker.
+Segment = Tuple[Optional[str], Optional[float], Optional[float], str]
+
+TIMESTAMP_RE = re.compile(r"^(?:(\d+):)?(\d{1,2}):(\d{1,2})(?:[.,](\d{1,3}))?$")
+TAG_RE = re.compile(r"<[^>]*>")
+VOICE_RE = re.compile(r"^<v(?:\.[^ >]*)?\s+([^>]+)>")
+JSON_SEPARATOR_RE = re.compile(r"[\s,]*")
+JSON_BLOCK_CHARS = 1 << 16  # characters read per step when streaming a JSON array
+# Speaker prefixes in subtitle text: "[SPEAKER_00]", "[SPEAKER_00]:", "Speaker A:", "SPEAKER_01:" (any case),
+# or ">> Alice:" (ASR speaker-change marker with a name). A bare "Word:" is ordinary text, not a speaker.
+CUE_SPEAKER_RE = re.compile(
+    r"^(?:\[([^\]]{1,40})\]:?|((?i:speaker|spk)(?:[ _-]\w+|\d+)):|>>\s*([^:]{1,40}):)\s*(.*)$")
+
+def parse_timestamp(value: Any) -> Optional[float]:
+    """Seconds from a number or a '[HH:]MM:SS[.,mmm]' / numeric string; None if missing or malformed."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    value = str(value).strip()
+    match = TIMESTAMP_RE.match(value)
+    if match:
+        hours, minutes, seconds, millis = match.groups()
+        return int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds) + int((millis or '0').ljust(3, '0')) / 1000
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+def _split_cue_speaker(text: str) -> Tuple[Optional[str], str]:
+    voice = VOICE_RE.match(text)
+    if voice:
+        return voice.group(1).strip(), TAG_RE.sub('', text[voice.end():]).strip()
+    text = TAG_RE.sub('', text).strip()
+    match = CUE_SPEAKER_RE.match(text)
+    if match:
+        return (match.group(1) or match.group(2) or match.group(3)).strip(), match.group(4).strip()
+    return None, text
+
+def is_cue_timing(line: str) -> bool:
+    """True for a 'start --> end' cue timing line whose start and end are both timestamps."""
+    start_text, arrow, end_text = line.partition('-->')
+    end_fields = end_text.split()
+    return bool(arrow and end_fields) and parse_timestamp(start_text) is not None \
+        and parse_timestamp(end_fields[0]) is not None
+
+def parse_cue_segments(lines: Iterable[str]) -> Iterator[Segment]:
+    """
+    Segments of an SRT or WebVTT file. Only blocks with a 'start --> end' timing
+    line (see is_cue_timing) are cues, so SRT indices, the WEBVTT header, cue identifiers and NOTE or
+    STYLE blocks are skipped. Formatting tags are removed; a WebVTT voice tag
+    (<v Name>) or a speaker prefix in the text (see CUE_SPEAKER_RE) names the speaker.
+    """
+    start = end = None
+    text_lines: List[str] = []
+    in_cue = False
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
+            if in_cue and text_lines:
+                speaker, text = _split_cue_speaker(' '.join(text_lines))
+                if text:
+                    yield speaker, start, end, text
+            in_cue = False
+            text_lines = []
+            continue
+        if is_cue_timing(stripped):
+            if in_cue and text_lines:
+                speaker, text = _split_cue_speaker(' '.join(text_lines))
+                if text:
+                    yield speaker, start, end, text
+            start_text, _, end_text = stripped.partition('-->')
+            end_fields = end_text.split()
+            start, end = parse_timestamp(start_text), parse_timestamp(end_fields[0] if end_fields else None)
+            in_cue = True
+            text_lines = []
+        elif in_cue:
+            text_lines.append(stripped)
+    if in_cue and text_lines:
+        speaker, text = _split_cue_speaker(' '.join(text_lines))
+        if text:
+            yield speaker, start, end, text
+
+def segment_from_record(record: Dict[str, Any]) -> Segment:
+    """A segment from an ASR JSON record ('speaker', 'start', 'end', 'text' and common aliases)."""
+    speaker = record.get('speaker', record.get('speaker_label', record.get('spk')))
+    start = record.get('start', record.get('start_time'))
+    end = record.get('end', record.get('end_time'))
+    text = record.get('text', record.get('transcript')) or ''
+    return (None if speaker is None else str(speaker)), parse_timestamp(start), parse_timestamp(end), str(text).strip()
+
+def _records_from_document(document: Any) -> List[Any]:
+    if isinstance(document, dict):
+        for key in ('segments', 'utterances', 'results'):
+            if isinstance(document.get(key), list):
+                return document[key]
+        return [document]
+    return document if isinstance(document, list) else []
+
+def _iter_text_blocks(lines: Iterable[str], block_chars: int) -> Iterator[str]:
+    """Blocks of block_chars characters from a readable text file, or the items of any other iterable."""
+    read = getattr(lines, 'read', None)
+    if read is None:
+        yield from lines
+        return
+    for block in iter(lambda: read(block_chars), ''):
+        yield block
+
+def parse_json_segments(lines: Iterable[str]) -> Iterator[Segment]:
+    """
+    Segments of a JSON transcript: an array of segment records, decoded one
+    element at a time as blocks of text arrive, or an object holding the records
+    under 'segments', 'utterances' or 'results' (which is decoded as a whole).
+    Array elements are decoded in place from a read position; the consumed
+    part of the buffer is only dropped once it exceeds a block, so long
+    single-line arrays parse in linear time.
+    """
+    decoder = json.JSONDecoder()
+    blocks = _iter_text_blocks(lines, JSON_BLOCK_CHARS)
+    buffer = ''
+    for block in blocks:
+        buffer += block
+        if buffer.strip():
+            break
+    buffer = buffer.lstrip()
+    if not buffer.startswith('['):
+        for record in _records_from_document(json.loads(buffer + ''.join(blocks))):
+            if isinstance(record, dict):
+                yield segment_from_record(record)
+        return
+    pos = 1
+    exhausted = False
+    while True:
+        pos = JSON_SEPARATOR_RE.match(buffer, pos).end()
+        if buffer.startswith(']', pos):
+            return
+        try:
+            record, end = decoder.raw_decode(buffer, pos) if pos < len(buffer) else (None, pos)
+        except json.JSONDecodeError:
+            end = pos
+        if end > pos and (end < len(buffer) or exhausted):
+            if isinstance(record, dict):
+                yield segment_from_record(record)
+            pos = end
+            continue
+        if exhausted:
+            if buffer[pos:].strip():
+                raise ValueError("Truncated JSON transcript")
+            return
+        if pos > JSON_BLOCK_CHARS:
+            buffer, pos = buffer[pos:], 0
+        block = next(blocks, None)
+        if block is None:
+            exhausted = True
+        else:
+            buffer += block
+
+def parse_jsonl_segments(lines: Iterable[str]) -> Iterator[Segment]:
+    """Segments of a JSON Lines transcript, one segment record per line."""
+    for line in lines:
+        if line.strip():
+            record = json.loads(line)
+            if isinstance(record, dict):
+                yield segment_from_record(record)
+
+# Timed transcript formats: name -> (segment parser, file extensions). Extend with register_transcript_format.
+TRANSCRIPT_FORMATS: Dict[str, Tuple[Callable[[Iterable[str]], Iterator[Segment]], Tuple[str, ...]]] = {
+    'srt': (parse_cue_segments, ('.srt',)),
+    'vtt': (parse_cue_segments, ('.vtt',)),
+    'json': (parse_json_segments, ('.json',)),
+    'jsonl': (parse_jsonl_segments, ('.jsonl', '.ndjson')),
+}
+SPEAKER_LINES_FORMAT = 'speaker'
+SPEAKER_LINES_EXTENSIONS = ('.txt',)
+
+def register_transcript_format(name: str, parser: Callable[[Iterable[str]], Iterator[Segment]],
+                               extensions: Tuple[str, ...] = ()) -> None:
+    """Adds (or replaces) a timed transcript format; parser turns lines into segments."""
+    TRANSCRIPT_FORMATS[name] = (parser, tuple(extension.lower() for extension in extensions))
+
+def transcript_extensions() -> Tuple[str, ...]:
+    """File extensions of all supported transcript formats, including '.txt' for 'Speaker X:' lines."""
+    return SPEAKER_LINES_EXTENSIONS + tuple(extension for _, extensions in TRANSCRIPT_FORMATS.values() for extension in extensions)
+
+def format_from_path(path: Any) -> Optional[str]:
+    """The format for path's extension ('Speaker X:' lines for .txt), or None if the extension is unknown."""
+    extension = os.path.splitext(os.fspath(path))[1].lower()
+    if extension in SPEAKER_LINES_EXTENSIONS:
+        return SPEAKER_LINES_FORMAT
+    for name, (_, extensions) in TRANSCRIPT_FORMATS.items():
+        if extension in extensions:
+            return name
+    return None
+
+def detect_format(first_line: str) -> str:
+    """
+    Guesses the format from the first non-blank line of a transcript. A line
+    only counts as JSON if its opening bracket is followed by something JSON can
+    continue with, so header lines like '[Call recording]' stay speaker lines.
+    """
+    line = first_line.strip().lstrip('\ufeff').strip()
+    if line.startswith('WEBVTT'):
+        return 'vtt'
+    if line.isdigit() or is_cue_timing(line):
+        return 'srt'
+    if line.startswith('['):
+        return 'json' if line[1:].lstrip()[:1] in ('', '{', '[', ']') else SPEAKER_LINES_FORMAT
+    if line.startswith('{'):
+        if line[1:].lstrip()[:1] not in ('', '"', '}'):
+            return SPEAKER_LINES_FORMAT
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return 'json'
+        return 'json' if isinstance(record, dict) and set(record) & {'segments', 'utterances', 'results'} else 'jsonl'
+    return SPEAKER_LINES_FORMAT
+
+class TranscriptTiming:
+    """
+    Per-speaker timing metrics, accumulated one segment at a time while a timed
+    transcript is parsed. Talk time is the sum of segment durations. Overlap is
+    time a speaker talks while another speaker's segment is still running.
+    Silence before a segment is a response gap if the previous segment was
+    another speaker's and a pause if it was the same speaker's.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """Forgets all segments fed so far."""
+        self.speakers: Dict[str, Dict[str, float]] = {}
+        self.first_start: Optional[float] = None
+        self.last_end: Optional[float] = None
+        self._last_speaker: Optional[str] = None
+
+    @property
+    def has_times(self) -> bool:
+        return self.first_start is not None
+
+    def feed(self, speaker: str, start: Optional[float], end: Optional[float], words: int) -> None:
+        if start is None or end is None:
+            return
+        end = max(end, start)
+        stats = self.speakers.get(speaker)
+        if stats is None:
+            stats = self.speakers[speaker] = {'segments': 0, 'talk_s': 0.0, 'words': 0, 'overlap_s': 0.0,
+                                              'gap_s': 0.0, 'gaps': 0, 'pause_s': 0.0}
+        stats['segments'] += 1
+        stats['talk_s'] += end - start
+        stats['words'] += words
+        if self.last_end is None:
+            self.first_start = start
+        elif start < self.last_end:
+            if speaker != self._last_speaker:
+                stats['overlap_s'] += min(end, self.last_end) - start
+        elif speaker == self._last_speaker:
+            stats['pause_s'] += start - self.last_end
+        else:
+            stats['gap_s'] += start - self.last_end
+            stats['gaps'] += 1
+        self.first_start = min(self.first_start, start)
+        if self.last_end is None or end >= self.last_end:
+            self.last_end = end
+            self._last_speaker = speaker
+
+    def totals(self) -> Dict[str, float]:
+        """Transcript duration, total talk time, silence and overlap in seconds."""
+        duration = (self.last_end - self.first_start) if self.has_times else 0.0
+        return {
+            'duration_s': duration,
+            'talk_s': sum(stats['talk_s'] for stats in self.speakers.values()),
+            'silence_s': sum(stats['gap_s'] + stats['pause_s'] for stats in self.speakers.values()),
+            'overlap_s': sum(stats['overlap_s'] for stats in self.speakers.values()),
+        }
+
+    def speaker_rows(self) -> List[Dict[str, Any]]:
+        """One row per speaker with talk time, talk share, words per minute, overlap, gaps and pauses."""
+        total_talk = sum(stats['talk_s'] for stats in self.speakers.values())
+        rows = []
+        for speaker, stats in self.speakers.items():
+            talk_s = stats['talk_s']
+            rows.append({
+                'Speaker': speaker,
+                'Talk Time (s)': round(talk_s, 1),
+                'Talk Share': round(talk_s / total_talk, 4) if total_talk > 0 else 0.0,
+                'Words/Min': round(stats['words'] / (talk_s / 60), 1) if talk_s > 0 else 0.0,
+                'Overlap (s)': round(stats['overlap_s'], 1),
+                'Avg Response Gap (s)': round(stats['gap_s'] / stats['gaps'], 2) if stats['gaps'] else 0.0,
+                'Pauses (s)': round(stats['pause_s'], 1),
+            })
+        return rows
+
+def merge_segments(segments: Iterable[Segment], timing: Optional[TranscriptTiming] = None) -> Iterator[Turn]:
+    """
+    Merges consecutive segments of the same speaker into turns (start of the
+    first segment, latest end), feeding every segment to timing on the way.
+    """
+    speaker = None
+    texts: List[str] = []
+    turn_start = turn_end = None
+    turn_id = 0
+    for segment_speaker, start, end, text in segments:
+        if not text:
+            continue
+        segment_speaker = segment_speaker or speaker or UNKNOWN_SPEAKER
+        if timing is not None:
+            timing.feed(segment_speaker, start, end, len(text.split()))
+        if segment_speaker == speaker:
+            texts.append(text)
+            if end is not None and (turn_end is None or end > turn_end):
+                turn_end = end
+            continue
+        if texts:
+            turn_id += 1
+            yield Turn(turn_id, speaker, ' '.join(texts), turn_start, turn_end)
+        speaker, texts, turn_start, turn_end = segment_speaker, [text], start, end
+    if texts:
+        yield Turn(turn_id + 1, speaker, ' '.join(texts), turn_start, turn_end)
+
+def iter_timed_turns(lines: Iterable[str], fmt: str, timing: Optional[TranscriptTiming] = None) -> Iterator[Turn]:
+    """Parses the lines of a timed transcript in format fmt into merged turns."""
+    if fmt not in TRANSCRIPT_FORMATS:
+        raise ValueError(f"Unknown transcript format '{fmt}'")
+    parser, _ = TRANSCRIPT_FORMATS[fmt]
+    return merge_segments(parser(lines), timing)
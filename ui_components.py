@@ -1,85 +1,257 @@
+import html
+import time
+from typing import Dict, List, Tuple
+import numpy as np
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from instrumentation import PerfRecorder, recorder
+from summary_metrics import summarize_results, results_content_hash
+from conversation_dynamics import conversation_dynamics, signed_sentiment
+from exports import available_export_formats, export_bytes, export_file_name, export_mime_type
 from constants import (
-    COL_TURN_NUM, COL_SPEAKER, COL_DIALOGUE, COL_SENTIMENT_LABEL,
-    COL_SENTIMENT_SCORE, COL_FILLER_COUNT, COL_TOTAL_WORDS, COL_FILLER_RATIO
+    COL_TRANSCRIPT, COL_TURN_NUM, COL_SENTENCE_NUM, COL_SENTENCE, COL_SPEAKER, COL_DIALOGUE, COL_SENTIMENT_LABEL,
+    COL_SENTIMENT_SCORE, COL_FILLER_COUNT, COL_TOTAL_WORDS, COL_FILLER_RATIO,
+    TRANSCRIPT_PAGE_SIZE, CHART_MAX_POINTS, SPEAKER_COLORS, CORPUS_SEARCH_LIMIT, DYNAMICS_WINDOW_TURNS, \
+    DYNAMICS_SHIFT_TURNS, SENTENCE_SENTIMENT_DEFAULT
 )
 
+DISPLAY_COLUMNS = [COL_TURN_NUM, COL_SPEAKER, COL_DIALOGUE, COL_SENTIMENT_LABEL, COL_SENTIMENT_SCORE,
+                   COL_FILLER_COUNT, COL_TOTAL_WORDS, COL_FILLER_RATIO]
+
+def format_percent(values: pd.Series) -> pd.Series:
+    """Formats fractions as percentages with one decimal place (0.1234 -> '12.3%') in one vectorized pass."""
+    return pd.Series(np.char.mod('%.1f%%', values.to_numpy(dtype=np.float64) * 100), index=values.index, dtype=object)
+
+def chat_styles(speakers: List[str]) -> str:
+    """
+    One stylesheet for the chat view: each speaker gets a class with its own
+    background color (cycling through SPEAKER_COLORS), so turns only carry a class
+    name. The first speaker is aligned left and all others right.
+    """
+    rules = [
+        ".chat-window { max-height: 640px; overflow-y: auto; padding-right: 8px; }",
+        ".chat-turn { margin-bottom: 10px; text-align: right; }",
+        ".chat-turn span { display: inline-block; padding: 5px 10px; border-radius: 10px; text-align: left; }",
+        ".chat-spk-0 { text-align: left; }",
+    ]
+    for index in range(len(speakers)):
+        rules.append(f".chat-spk-{index} span {{ background-color: {SPEAKER_COLORS[index % len(SPEAKER_COLORS)]}; }}")
+    return "<style>" + "\n".join(rules) + "</style>"
+
+def format_timestamp(seconds: float) -> str:
+    """Formats seconds as [H:]MM:SS."""
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes:02d}:{secs:02d}"
+
+def render_chat_html(turns: list, speaker_index: Dict[str, int]) -> str:
+    """
+    Builds the chat bubbles for turns as a single HTML string, escaping speaker
+    names and text. Turns of timed transcripts are prefixed with their start time.
+    """
+    parts = ["<div class='chat-window'>"]
+    for turn in turns:
+        start = getattr(turn, 'start', None)
+        timestamp = f"<small>[{format_timestamp(start)}]</small> " if start is not None else ""
+        parts.append(f"<div class='chat-turn chat-spk-{speaker_index[turn.speaker]}'><span>{timestamp}<b>"
+                     f"{html.escape(turn.speaker)}:</b> {html.escape(turn.text)}</span></div>")
+    parts.append("</div>")
+    return "".join(parts)
+
+def display_chat_transcript(raw_turns: list, page_size: int = TRANSCRIPT_PAGE_SIZE, key: str = "transcript"):
+    """
+    Renders the conversation as chat bubbles, one page of page_size turns at a
+    time, sent to the browser as a single scrollable HTML block.
+    """
+    speakers = list(dict.fromkeys(turn.speaker for turn in raw_turns))
+    speaker_index = {speaker: index for index, speaker in enumerate(speakers)}
+    num_pages = max(1, -(-len(raw_turns) // page_size))
+    page = 1
+    if num_pages > 1:
+        page = int(st.number_input(f"Page (of {num_pages}, {page_size} turns each)", min_value=1,
+                                   max_value=num_pages, value=1, step=1, key=f"{key}_page"))
+    start = (page - 1) * page_size
+    page_turns = raw_turns[start:start + page_size]
+    if num_pages > 1:
+        st.caption(f"Showing turns {start + 1}–{start + len(page_turns)} of {len(raw_turns)}")
+    st.markdown(chat_styles(speakers) + render_chat_html(page_turns, speaker_index), unsafe_allow_html=True)
+
+def _bucket_means(values: np.ndarray, starts: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+    return np.add.reduceat(values.astype(np.float64), starts) / sizes
+
+def downsample_turns(df_analysis: pd.DataFrame, max_points: int = CHART_MAX_POINTS) -> Tuple[pd.DataFrame, int]:
+    """
+    Reduces the per-turn frame to at most max_points rows for plotting by averaging
+    runs of consecutive turns (score, filler ratio, word and filler counts); each
+    run takes its most frequent sentiment label and the number of its first turn.
+    Returns the frame and the number of turns per point (1 if unchanged).
+    """
+    num_turns = len(df_analysis)
+    if num_turns <= max_points:
+        return df_analysis, 1
+    step = -(-num_turns // max_points)
+    starts = np.arange(0, num_turns, step)
+    sizes = np.diff(np.append(starts, num_turns))
+    labels = df_analysis[COL_SENTIMENT_LABEL].astype('category')
+    label_counts = np.zeros((len(starts), len(labels.cat.categories)), dtype=np.int64)
+    np.add.at(label_counts, (np.arange(num_turns) // step, labels.cat.codes.to_numpy()), 1)
+    return pd.DataFrame({
+        COL_TURN_NUM: df_analysis[COL_TURN_NUM].to_numpy()[starts],
+        COL_SENTIMENT_LABEL: labels.cat.categories.to_numpy()[label_counts.argmax(axis=1)],
+        COL_SENTIMENT_SCORE: _bucket_means(df_analysis[COL_SENTIMENT_SCORE].to_numpy(), starts, sizes),
+        COL_FILLER_COUNT: _bucket_means(df_analysis[COL_FILLER_COUNT].to_numpy(), starts, sizes),
+        COL_TOTAL_WORDS: _bucket_means(df_analysis[COL_TOTAL_WORDS].to_numpy(), starts, sizes),
+        COL_FILLER_RATIO: _bucket_means(df_analysis[COL_FILLER_RATIO].to_numpy(), starts, sizes),
+    }), step
+
 def display_transcript_analysis_tab(df_analysis: pd.DataFrame, raw_turns: list):
     """Renders the 'Transcript Analysis' tab."""
     st.header("🗣️ Conversation Transcript")
     if not raw_turns:
         st.warning("No transcript data to display.")
         return
-    for turn in raw_turns:
-        if turn['speaker'] == "Speaker A":
-            st.markdown(f"<div style='text-align: left; margin-bottom: 10px;'><span style='background-color: #e1f5fe; padding: 5px 10px; border-radius: 10px;'><b>{turn['speaker']}:</b> {turn['text']}</span></div>", unsafe_allow_html=True)
-        else:
-            st.markdown(f"<div style='text-align: right; margin-bottom: 10px;'><span style='background-color: #e8f5e9; padding: 5px 10px; border-radius: 10px;'><b>{turn['speaker']}:</b> {turn['text']}</span></div>", unsafe_allow_html=True)
+    display_chat_transcript(raw_turns)
     st.header("Turn-by-Turn Analysis")
     if df_analysis.empty:
         st.warning("No analysis data to display.")
         return
-    df_display = df_analysis.copy()
-    df_display[COL_SENTIMENT_SCORE] = df_display[COL_SENTIMENT_SCORE].apply(lambda x: f"{x:.1%}")
-    df_display[COL_FILLER_RATIO] = df_display[COL_FILLER_RATIO].apply(lambda x: f"{x:.1%}")
-    st.dataframe(df_display[[COL_TURN_NUM, COL_SPEAKER, COL_DIALOGUE, COL_SENTIMENT_LABEL, COL_SENTIMENT_SCORE, COL_FILLER_COUNT, COL_TOTAL_WORDS, COL_FILLER_RATIO]], height=400)
-    # CSV download button
-    @st.cache_data
-    def convert_df_to_csv(df):
-        return df.to_csv(index=False).encode('utf-8')
-    csv_turn_by_turn = convert_df_to_csv(df_display)
-    st.download_button(
-        label="📥 Download Turn-by-Turn Analysis (CSV)",
-        data=csv_turn_by_turn,
-        file_name='turn_by_turn_analysis.csv',
-        mime='text/csv',
-    )
+    df_display = pd.DataFrame({column: df_analysis[column] for column in DISPLAY_COLUMNS}, copy=False)
+    df_display[COL_SENTIMENT_SCORE] = format_percent(df_analysis[COL_SENTIMENT_SCORE])
+    df_display[COL_FILLER_RATIO] = format_percent(df_analysis[COL_FILLER_RATIO])
+    st.dataframe(df_display, height=400)
+    display_export_buttons(pd.DataFrame({column: df_analysis[column] for column in DISPLAY_COLUMNS}, copy=False),
+                           results_content_hash(df_analysis), "Turn-by-Turn Analysis", "turn_by_turn_analysis", "turns")
+    df_chart, turns_per_point = downsample_turns(df_analysis)
+    chart_note = f" (mean of every {turns_per_point} turns)" if turns_per_point > 1 else ""
     st.subheader("Sentiment Score per Turn")
     if not df_analysis.empty and COL_SENTIMENT_SCORE in df_analysis.columns:
-        fig_sentiment_turn = px.bar(df_analysis, x=COL_TURN_NUM, y=COL_SENTIMENT_SCORE, color=COL_SENTIMENT_LABEL,
-                                    title="Sentiment Score by Turn",
+        fig_sentiment_turn = px.bar(df_chart, x=COL_TURN_NUM, y=COL_SENTIMENT_SCORE, color=COL_SENTIMENT_LABEL,
+                                    title="Sentiment Score by Turn" + chart_note,
                                     labels={COL_SENTIMENT_SCORE: "Sentiment Score", COL_TURN_NUM: "Turn Number"},
                                     color_discrete_map={'POSITIVE': 'green', 'NEGATIVE': 'red', 'NEUTRAL': 'grey', 'positive': 'green', 'negative': 'red', 'neutral': 'grey'})
         st.plotly_chart(fig_sentiment_turn, use_container_width=True)
     st.subheader("Filler Word Ratio per Turn")
     if not df_analysis.empty and COL_FILLER_RATIO in df_analysis.columns:
-        fig_filler_turn = px.line(df_analysis, x=COL_TURN_NUM, y=COL_FILLER_RATIO,
-                                 title="Filler Word Ratio by Turn", markers=True,
+        fig_filler_turn = px.line(df_chart, x=COL_TURN_NUM, y=COL_FILLER_RATIO,
+                                 title="Filler Word Ratio by Turn" + chart_note, markers=turns_per_point == 1,
                                  labels={COL_FILLER_RATIO: "Filler Word Ratio (%)", COL_TURN_NUM: "Turn Number"})
         fig_filler_turn.update_layout(yaxis_tickformat=".1%")
         st.plotly_chart(fig_filler_turn, use_container_width=True)
+    if st.checkbox("Sentence-level sentiment", value=SENTENCE_SENTIMENT_DEFAULT, key="sentence_sentiment",
+                   help="Scores every sentence separately to reveal turns with mixed sentiment."):
+        display_sentence_sentiment(df_analysis, raw_turns)
 
-def display_summary_metrics_tab(df_analysis: pd.DataFrame):
-    """Renders the 'Summary Metrics' tab."""
+@st.cache_data(max_entries=8)
+def get_sentence_sentiment(content_hash: str, _turns: list) -> tuple:
+    """Per-sentence results and their per-turn rollup, cached on the turn results' content hash."""
+    from sentence_sentiment import analyze_sentences, sentence_rollup
+    df_sentences = analyze_sentences(_turns)
+    return df_sentences, sentence_rollup(df_sentences)
+
+def display_sentence_sentiment(df_analysis: pd.DataFrame, raw_turns: list):
+    """Renders the sentence-level sentiment timeline, the mixed turns and the per-sentence table."""
+    st.subheader("Sentence-Level Sentiment")
+    # Jobs analyze turns in order, so partial results cover the first len(df_analysis) turns.
+    turns = raw_turns[:len(df_analysis)]
+    with st.spinner("Scoring sentences..."):
+        df_sentences, rollup = get_sentence_sentiment(results_content_hash(df_analysis), turns)
+    if df_sentences.empty:
+        st.info("No sentences found.")
+        return
+    col1, col2 = st.columns(2)
+    col1.metric("Sentences", f"{len(df_sentences):,}")
+    col2.metric("Turns with Mixed Sentiment", f"{int(rollup['Mixed'].sum()):,}")
+    step = max(1, -(-len(df_sentences) // CHART_MAX_POINTS))
+    timeline = pd.DataFrame({
+        'Sentence': np.arange(1, len(df_sentences) + 1)[::step],
+        COL_TURN_NUM: df_sentences[COL_TURN_NUM].to_numpy()[::step],
+        COL_SENTIMENT_LABEL: df_sentences[COL_SENTIMENT_LABEL].to_numpy()[::step],
+        'Signed Sentiment': signed_sentiment(df_sentences)[::step],
+    })
+    chart_note = f" (every {step} sentences)" if step > 1 else ""
+    fig_sentences = px.scatter(timeline, x='Sentence', y='Signed Sentiment', color=COL_SENTIMENT_LABEL,
+                               hover_data=[COL_TURN_NUM], title="Sentiment per Sentence" + chart_note,
+                               labels={'Signed Sentiment': "Sentiment (-1 negative … +1 positive)",
+                                       'Sentence': "Sentence Number"},
+                               color_discrete_map={'POSITIVE': 'green', 'NEGATIVE': 'red', 'NEUTRAL': 'grey',
+                                                   'positive': 'green', 'negative': 'red', 'neutral': 'grey'})
+    st.plotly_chart(fig_sentences, use_container_width=True)
+    mixed = rollup[rollup['Mixed']]
+    if not mixed.empty:
+        st.markdown("**Turns with mixed sentiment**")
+        turn_columns = df_analysis[[COL_TURN_NUM, COL_SPEAKER, COL_DIALOGUE, COL_SENTIMENT_LABEL]]
+        st.dataframe(mixed.merge(turn_columns, on=COL_TURN_NUM, how='left').drop(columns='Mixed'),
+                     hide_index=True, use_container_width=True)
+    only_mixed = st.checkbox("Show only sentences of mixed turns", key="sentences_only_mixed")
+    df_table = df_sentences[df_sentences[COL_TURN_NUM].isin(mixed[COL_TURN_NUM])] if only_mixed else df_sentences
+    df_table = df_table.assign(**{COL_SENTIMENT_SCORE: format_percent(df_table[COL_SENTIMENT_SCORE])})
+    st.dataframe(df_table[[COL_TURN_NUM, COL_SPEAKER, COL_SENTENCE_NUM, COL_SENTENCE, COL_SENTIMENT_LABEL,
+                           COL_SENTIMENT_SCORE]], hide_index=True, height=400, use_container_width=True)
+    display_export_buttons(df_sentences, results_content_hash(df_analysis), "Sentence Sentiment",
+                           "sentence_sentiment", "sentences")
+
+@st.cache_data(max_entries=4)
+def get_export(content_hash: str, kind: str, export_format: str, _df: pd.DataFrame) -> bytes:
+    """Export bytes of a table, cached on the results' content hash, the table kind and the format."""
+    with recorder.stage('export'):
+        return export_bytes(_df, export_format)
+
+def display_export_buttons(df: pd.DataFrame, content_hash: str, label: str, file_stem: str, key: str):
+    """
+    Renders a format selector and a download button for df. The file is only
+    built after 'Prepare' is clicked (and then cached), not on every rerun;
+    numeric columns are exported as numbers, not display strings.
+    """
+    formats = available_export_formats()
+    col_format, col_button = st.columns([1, 3])
+    export_format = col_format.selectbox(f"{label} export format", formats, key=f"{key}_export_format",
+                                         label_visibility="collapsed")
+    prepared_key = f"{key}_export_prepared"
+    if st.session_state.get(prepared_key) != (content_hash, export_format):
+        if not col_button.button(f"📦 Prepare {label} ({export_format})", key=f"{key}_export_prepare"):
+            return
+        st.session_state[prepared_key] = (content_hash, export_format)
+    try:
+        data = get_export(content_hash, key, export_format, df)
+    except (ValueError, ImportError) as e:
+        recorder.record_error('export', e)
+        col_button.error(f"Export failed: {e}")
+        return
+    col_button.download_button(
+        label=f"📥 Download {label} ({export_format})",
+        data=data,
+        file_name=export_file_name(file_stem, export_format),
+        mime=export_mime_type(export_format),
+        key=f"{key}_export_download",
+    )
+
+@st.cache_data(max_entries=16)
+def get_summary(content_hash: str, _df_analysis: pd.DataFrame) -> dict:
+    """Summary metrics for a results frame, cached on its content hash (the frame itself is not hashed)."""
+    with recorder.stage('aggregation'):
+        return summarize_results(_df_analysis)
+
+def display_summary_metrics_tab(df_analysis: pd.DataFrame, timing=None):
+    """
+    Renders the 'Summary Metrics' tab. With the TranscriptTiming of a timed
+    transcript, talk-time metrics are shown with the per-speaker analysis.
+    """
     st.header("📊 Overall Conversation Metrics")
     if df_analysis.empty:
         st.warning("No analysis data to display for summary.")
         return
-    num_turns = len(df_analysis)
-    total_words_corpus = df_analysis[COL_TOTAL_WORDS].sum()
-    avg_words_turn = total_words_corpus / num_turns if num_turns > 0 else 0
-    overall_filler_words = df_analysis[COL_FILLER_COUNT].sum()
-    avg_filler_ratio_corpus = overall_filler_words / total_words_corpus if total_words_corpus > 0 else 0
+    summary = get_summary(results_content_hash(df_analysis), df_analysis)
+    num_turns = summary['num_turns']
     col1, col2, col3, col4 = st.columns(4)
     col1.metric("Total Turns", num_turns, "🔄")
-    col2.metric("Total Words", f"{total_words_corpus:,}", "📄")
-    col3.metric("Avg Words/Turn", f"{avg_words_turn:.1f}", "🗣️")
-    col4.metric("Avg Filler Ratio", f"{avg_filler_ratio_corpus:.1%}", "💬")
+    col2.metric("Total Words", f"{summary['total_words']:,}", "📄")
+    col3.metric("Avg Words/Turn", f"{summary['avg_words_turn']:.1f}", "🗣️")
+    col4.metric("Avg Filler Ratio", f"{summary['avg_filler_ratio']:.1%}", "💬")
     st.markdown("---")
     st.subheader("Per-Speaker Analysis")
-    speaker_summary = df_analysis.groupby(COL_SPEAKER).agg(
-        Turns=(COL_TURN_NUM, 'count'),
-        Total_Words=(COL_TOTAL_WORDS, 'sum'),
-        Total_Filler_Words=(COL_FILLER_COUNT, 'sum'),
-        Positive_Turns=(COL_SENTIMENT_LABEL, lambda x: (x.str.lower() == 'positive').sum()),
-        Neutral_Turns=(COL_SENTIMENT_LABEL, lambda x: (x.str.lower() == 'neutral').sum()),
-        Negative_Turns=(COL_SENTIMENT_LABEL, lambda x: (x.str.lower() == 'negative').sum())
-    ).reset_index()
+    speaker_summary = summary['speakers']
     if not speaker_summary.empty:
-        speaker_summary['Avg_Words_Turn'] = (speaker_summary['Total_Words'] / speaker_summary['Turns']).round(1)
-        speaker_summary['Filler_Ratio'] = ((speaker_summary['Total_Filler_Words'] / speaker_summary['Total_Words'])).apply(lambda x: f"{x:.1%}" if pd.notnull(x) and speaker_summary['Total_Words'].any() > 0 else "0.0%")
         speaker_display_df = speaker_summary.rename(columns={
             COL_SPEAKER: "Speaker",
             "Total_Words": "Total Words",
@@ -89,9 +261,22 @@ def display_summary_metrics_tab(df_analysis: pd.DataFrame):
             "Neutral_Turns": "Neutral",
             "Negative_Turns": "Negative"
         })
-        st.dataframe(speaker_display_df[['Speaker', 'Turns', 'Total Words', 'Avg. Words/Turn', 'Avg. Filler Ratio', 'Positive', 'Neutral', 'Negative']])
+        speaker_display_df["Avg. Filler Ratio"] = format_percent(speaker_display_df["Avg. Filler Ratio"])
+        display_columns = ['Speaker', 'Turns', 'Total Words', 'Avg. Words/Turn', 'Avg. Filler Ratio', 'Positive', 'Neutral', 'Negative']
+        if timing is not None and timing.has_times:
+            display_talk_time_metrics(timing)
+            timing_df = pd.DataFrame(timing.speaker_rows())
+            timing_df['Talk Share'] = format_percent(timing_df['Talk Share'])
+            speaker_display_df = speaker_display_df.merge(timing_df, on='Speaker', how='left')
+            display_columns += [column for column in timing_df.columns if column != 'Speaker']
+        st.dataframe(speaker_display_df[display_columns])
+        speaker_export_df = speaker_summary
+        if timing is not None and timing.has_times:
+            speaker_export_df = speaker_summary.merge(pd.DataFrame(timing.speaker_rows()), on=COL_SPEAKER, how='left')
+        display_export_buttons(speaker_export_df, results_content_hash(df_analysis), "Per-Speaker Summary",
+                               "speaker_summary", "speakers")
         # Debug print for sentiment label values
-        st.write("Sentiment label values:", df_analysis[COL_SENTIMENT_LABEL].unique())
+        st.write("Sentiment label values:", summary['sentiment_counts'][COL_SENTIMENT_LABEL].tolist())
         sentiment_speaker_df = speaker_summary.melt(id_vars=[COL_SPEAKER], value_vars=['Positive_Turns', 'Neutral_Turns', 'Negative_Turns'],
                                                     var_name='Sentiment Type', value_name='Count')
         sentiment_speaker_df['Sentiment Type'] = sentiment_speaker_df['Sentiment Type'].str.replace('_Turns', '')
@@ -101,54 +286,198 @@ def display_summary_metrics_tab(df_analysis: pd.DataFrame):
         st.plotly_chart(fig_sentiment_speaker, use_container_width=True)
     st.markdown("---")
     st.subheader("Overall Sentiment Distribution")
-    sentiment_counts = df_analysis[COL_SENTIMENT_LABEL].value_counts().reset_index()
-    sentiment_counts.columns = [COL_SENTIMENT_LABEL, 'Count']
+    sentiment_counts = summary['sentiment_counts']
     if not sentiment_counts.empty:
         fig_sentiment_pie = px.pie(sentiment_counts, names=COL_SENTIMENT_LABEL, values='Count',
                                    title="Overall Sentiment Distribution",
                                    color=COL_SENTIMENT_LABEL,
                                    color_discrete_map={'POSITIVE': 'green', 'NEGATIVE': 'red', 'NEUTRAL': 'grey'})
         st.plotly_chart(fig_sentiment_pie, use_container_width=True)
-        for _, row in sentiment_counts.iterrows():
-            st.markdown(f"- **{row[COL_SENTIMENT_LABEL]}**: {row['Count']} turns ({row['Count']/num_turns:.1%})")
+        st.markdown("\n".join(
+            f"- **{label}**: {count} turns ({count / num_turns:.1%})"
+            for label, count in zip(sentiment_counts[COL_SENTIMENT_LABEL], sentiment_counts['Count'])
+        ))
     st.markdown("---")
     st.subheader("Word Count Analysis")
-    min_words = df_analysis[COL_TOTAL_WORDS].min()
-    max_words = df_analysis[COL_TOTAL_WORDS].max()
-    median_words = df_analysis[COL_TOTAL_WORDS].median()
-    avg_words = df_analysis[COL_TOTAL_WORDS].mean()
     col_wc1, col_wc2, col_wc3, col_wc4 = st.columns(4)
-    col_wc1.metric("Min Words/Turn", f"{min_words:.0f}")
-    col_wc2.metric("Max Words/Turn", f"{max_words:.0f}")
-    col_wc3.metric("Median Words/Turn", f"{median_words:.0f}")
-    col_wc4.metric("Avg Words/Turn", f"{avg_words:.1f}")
-    if not df_analysis.empty:
-        # Robust binning for word count distribution
-        if max_words <= 10:
-            bins = [0, max_words + 1]
-            labels = [f'1-{max_words}']
-        elif max_words <= 20:
-            bins = [0, 10, max_words + 1]
-            labels = ['1-10', f'11-{max_words}']
-        elif max_words <= 30:
-            bins = [0, 10, 20, max_words + 1]
-            labels = ['1-10', '11-20', f'21-{max_words}']
-        elif max_words <= 50:
-            bins = [0, 10, 20, 30, 50, max_words + 1]
-            labels = ['1-10', '11-20', '21-30', '31-50', f'51-{max_words}']
-        else:
-            bins = [0, 10, 20, 30, 50, 100, max_words + 1]
-            labels = ['1-10', '11-20', '21-30', '31-50', '51-100', f'101-{max_words}']
-        # Ensure bins are unique
-        bins = list(dict.fromkeys(bins))
-        df_analysis['Word_Count_Range'] = pd.cut(df_analysis[COL_TOTAL_WORDS], bins=bins, labels=labels, right=True, include_lowest=True)
-        word_count_dist = df_analysis['Word_Count_Range'].value_counts().sort_index().reset_index()
-        word_count_dist.columns = ['Word Count Range', 'Number of Turns']
-        fig_word_dist = px.bar(word_count_dist, x='Word Count Range', y='Number of Turns',
-                               title="Distribution of Turns by Word Count",
-                               labels={'Number of Turns': "Number of Turns"})
-        st.plotly_chart(fig_word_dist, use_container_width=True)
-        fig_word_trend = px.bar(df_analysis, x=COL_TURN_NUM, y=COL_TOTAL_WORDS,
-                                 title="Word Count per Turn",
-                                 labels={COL_TOTAL_WORDS: "Number of Words", COL_TURN_NUM: "Turn Number"})
-        st.plotly_chart(fig_word_trend, use_container_width=True) 
\ No newline at end of file
+    col_wc1.metric("Min Words/Turn", f"{summary['min_words']:.0f}")
+    col_wc2.metric("Max Words/Turn", f"{summary['max_words']:.0f}")
+    col_wc3.metric("Median Words/Turn", f"{summary['median_words']:.0f}")
+    col_wc4.metric("Avg Words/Turn", f"{summary['avg_words']:.1f}")
+    fig_word_dist = px.bar(summary['word_count_distribution'], x='Word Count Range', y='Number of Turns',
+                           title="Distribution of Turns by Word Count",
+                           labels={'Number of Turns': "Number of Turns"})
+    st.plotly_chart(fig_word_dist, use_container_width=True)
+    df_chart, turns_per_point = downsample_turns(df_analysis)
+    chart_note = f" (mean of every {turns_per_point} turns)" if turns_per_point > 1 else ""
+    fig_word_trend = px.bar(df_chart, x=COL_TURN_NUM, y=COL_TOTAL_WORDS,
+                             title="Word Count per Turn" + chart_note,
+                             labels={COL_TOTAL_WORDS: "Number of Words", COL_TURN_NUM: "Turn Number"})
+    st.plotly_chart(fig_word_trend, use_container_width=True)
+
+@st.cache_data(max_entries=16)
+def get_dynamics(content_hash: str, window: int, shift_window: int, _df_analysis: pd.DataFrame) -> dict:
+    """Rolling conversation-dynamics metrics, cached on the results' content hash and the window sizes."""
+    with recorder.stage('dynamics'):
+        return conversation_dynamics(_df_analysis, window, shift_window)
+
+def display_dynamics_tab(df_analysis: pd.DataFrame):
+    """Renders the 'Conversation Dynamics' tab: rolling sentiment, filler ratio and turn-taking charts."""
+    st.header("📈 Conversation Dynamics")
+    if df_analysis.empty:
+        st.warning("No analysis data to display.")
+        return
+    col_window, col_shift = st.columns(2)
+    max_window = max(2, min(500, len(df_analysis)))
+    window = int(col_window.slider("Rolling window (turns)", 2, max_window, min(DYNAMICS_WINDOW_TURNS, max_window),
+                                   key="dynamics_window"))
+    shift_window = int(col_shift.slider("Turns compared around speaker changes", 1, 20, DYNAMICS_SHIFT_TURNS,
+                                        key="dynamics_shift_window"))
+    dynamics = get_dynamics(results_content_hash(df_analysis), window, shift_window, df_analysis)
+    timeline = dynamics['timeline']
+    # Rolling means are smooth, so long transcripts are charted at every step-th turn.
+    step = max(1, -(-len(timeline) // CHART_MAX_POINTS))
+    kept_turns = timeline[COL_TURN_NUM].iloc[::step]
+    chart_note = f" (every {step} turns)" if step > 1 else ""
+
+    st.subheader("Sentiment Over Time")
+    fig_sentiment = px.line(timeline.iloc[::step], x=COL_TURN_NUM, y='Rolling Sentiment',
+                            title=f"Rolling Mean of Signed Sentiment ({window} turns){chart_note}",
+                            labels={'Rolling Sentiment': "Sentiment (-1 negative … +1 positive)", COL_TURN_NUM: "Turn Number"})
+    st.plotly_chart(fig_sentiment, use_container_width=True)
+
+    st.subheader("Filler Ratio Over Time")
+    speaker_filler = dynamics['speaker_filler']
+    fig_filler = px.line(speaker_filler[speaker_filler[COL_TURN_NUM].isin(kept_turns)] if step > 1 else speaker_filler,
+                         x=COL_TURN_NUM, y='Rolling Filler Ratio', color=COL_SPEAKER,
+                         title=f"Rolling Filler Ratio per Speaker (last {window} turns of each speaker){chart_note}",
+                         labels={'Rolling Filler Ratio': "Filler Ratio", COL_TURN_NUM: "Turn Number"})
+    fig_filler.update_yaxes(tickformat='.0%')
+    st.plotly_chart(fig_filler, use_container_width=True)
+
+    st.subheader("Turn-Taking Balance")
+    word_share = dynamics['word_share']
+    fig_share = px.area(word_share[word_share[COL_TURN_NUM].isin(kept_turns)] if step > 1 else word_share,
+                        x=COL_TURN_NUM, y='Word Share', color=COL_SPEAKER,
+                        title=f"Share of Words in the Last {window} Turns{chart_note}",
+                        labels={'Word Share': "Share of Words", COL_TURN_NUM: "Turn Number"})
+    fig_share.update_yaxes(tickformat='.0%')
+    st.plotly_chart(fig_share, use_container_width=True)
+    fig_balance = px.line(timeline.iloc[::step], x=COL_TURN_NUM, y=['Balance', 'Speaker Change Rate'],
+                          title=f"Balance Index and Speaker-Change Rate ({window} turns){chart_note}",
+                          labels={'value': "Index / Rate", COL_TURN_NUM: "Turn Number", 'variable': ""})
+    st.plotly_chart(fig_balance, use_container_width=True)
+    st.caption("Balance is 1 when all speakers said equally much in the window and 0 when one speaker said everything.")
+
+    st.subheader("Sentiment Shifts at Speaker Changes")
+    shifts = dynamics['shifts']
+    if shifts.empty:
+        st.info("No speaker changes in this transcript.")
+        return
+    fig_shifts = px.scatter(shifts.iloc[::max(1, -(-len(shifts) // CHART_MAX_POINTS))], x=COL_TURN_NUM, y='Shift',
+                            color='To Speaker',
+                            title=f"Sentiment Change ({shift_window} turns after vs. before each speaker change)",
+                            labels={'Shift': "Sentiment Shift", COL_TURN_NUM: "Turn Number"})
+    st.plotly_chart(fig_shifts, use_container_width=True)
+    largest = shifts.reindex(shifts['Shift'].abs().nlargest(10).index)
+    st.dataframe(largest.round({'Sentiment Before': 3, 'Sentiment After': 3, 'Shift': 3}), hide_index=True)
+
+def display_talk_time_metrics(timing) -> None:
+    """Renders the transcript-level talk-time metrics of a timed transcript."""
+    totals = timing.totals()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Duration", format_timestamp(totals['duration_s']), "⏱️")
+    col2.metric("Talk Time", format_timestamp(totals['talk_s']), "🗣️")
+    col3.metric("Silence", format_timestamp(totals['silence_s']), "🤫")
+    col4.metric("Overlap", f"{totals['overlap_s']:.1f}s", "🔀")
+
+def display_job_progress(job) -> None:
+    """Renders a running background analysis job's progress bar with ETA and a cancel button."""
+    total = job.total_turns
+    if total is None:
+        text = "Parsing transcript..."
+    else:
+        eta = job.eta_seconds()
+        text = f"Analyzed {job.completed_turns:,} of {total:,} turns"
+        if eta is not None:
+            text += f" — about {eta:.0f}s remaining"
+    col_progress, col_cancel = st.columns([5, 1])
+    col_progress.progress(job.progress(), text=text)
+    col_cancel.button("Cancel analysis", on_click=job.cancel, key=f"cancel_{job.job_id}")
+
+def display_corpus_tab(corpus) -> None:
+    """Renders search and aggregate views over all transcripts stored in the corpus."""
+    corpus_stats = corpus.stats()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Transcripts", f"{corpus_stats['transcripts']:,}")
+    col2.metric("Turns", f"{corpus_stats['turns']:,}")
+    col3.metric("Words", f"{corpus_stats['words']:,}")
+    if not corpus_stats['transcripts']:
+        st.info("The corpus is empty. Analyzed transcripts are added automatically.")
+        return
+
+    st.subheader("🔎 Search Turns")
+    col_text, col_speaker, col_label, col_ratio = st.columns([3, 2, 2, 2])
+    text = col_text.text_input("Text (all words, 'word*' for prefixes)", key="corpus_text")
+    speaker = col_speaker.selectbox("Speaker", ["All"] + corpus.speakers(), key="corpus_speaker")
+    label = col_label.selectbox("Sentiment", ["All", "POSITIVE", "NEUTRAL", "NEGATIVE"], key="corpus_label")
+    min_ratio = col_ratio.slider("Min filler ratio", 0.0, 1.0, 0.0, 0.01, key="corpus_min_ratio")
+    start = time.perf_counter()
+    rows = corpus.search_turns(text=text, speaker=None if speaker == "All" else speaker,
+                               label=None if label == "All" else label, min_filler_ratio=min_ratio or None)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    recorder.observe('corpus_search_seconds', elapsed_ms / 1000)
+    limit_note = " (limit reached)" if len(rows) >= CORPUS_SEARCH_LIMIT else ""
+    st.caption(f"{len(rows):,} matching turns{limit_note} in {elapsed_ms:.1f} ms")
+    if rows:
+        df_rows = pd.DataFrame(rows, columns=[COL_TRANSCRIPT] + DISPLAY_COLUMNS)
+        df_rows[COL_FILLER_RATIO] = format_percent(df_rows[COL_FILLER_RATIO])
+        st.dataframe(df_rows, hide_index=True, use_container_width=True)
+
+    st.subheader("📚 Transcripts")
+    min_transcript_ratio = st.slider("Min overall filler ratio", 0.0, 1.0, 0.0, 0.01, key="corpus_transcript_ratio")
+    df_transcripts = pd.DataFrame(corpus.transcripts(min_filler_ratio=min_transcript_ratio or None))
+    if df_transcripts.empty:
+        st.caption("No transcripts match.")
+    else:
+        df_transcripts['added_at'] = pd.to_datetime(df_transcripts['added_at'], unit='s').dt.strftime('%Y-%m-%d %H:%M')
+        df_transcripts['filler_ratio'] = format_percent(df_transcripts['filler_ratio'])
+        st.dataframe(df_transcripts.drop(columns=['id', 'content_hash']), hide_index=True, use_container_width=True)
+
+    st.subheader("👥 Speakers Across the Corpus")
+    df_speakers = pd.DataFrame(corpus.speaker_stats())
+    if not df_speakers.empty:
+        df_speakers['filler_ratio'] = format_percent(df_speakers['filler_ratio'])
+        st.dataframe(df_speakers, hide_index=True, use_container_width=True)
+
+def display_performance_panel(perf: PerfRecorder):
+    """Renders the sidebar 'Performance' panel from the pipeline instrumentation."""
+    snapshot = perf.snapshot()
+    with st.sidebar.expander("⏱️ Performance"):
+        if not snapshot['stages']:
+            st.caption("No measurements yet.")
+            return
+        stage_df = pd.DataFrame([
+            {'Stage': name, 'Calls': stage['calls'], 'Wall (s)': round(stage['wall_s'], 3),
+             'CPU (s)': round(stage['cpu_s'], 3), 'Avg (ms)': round(stage['wall_s'] / stage['calls'] * 1000, 2)}
+            for name, stage in snapshot['stages'].items()
+        ])
+        st.dataframe(stage_df, hide_index=True)
+        hit_rate = perf.cache_hit_rate()
+        if hit_rate is not None:
+            st.metric("Cache hit rate", f"{hit_rate:.1%}")
+        for model, seconds in snapshot['model_load_s'].items():
+            st.caption(f"Model load ({model}): {seconds:.2f}s")
+        latency = snapshot['histograms'].get('chunk_turn_latency_seconds')
+        if latency and latency['count'] > 0:
+            st.caption(f"Time per turn, averaged per analysis chunk (avg {latency['sum'] / latency['count'] * 1000:.2f} ms "
+                       f"over {latency['count']} turns)")
+            bucket_labels = [f"≤{bound * 1000:g}ms" for bound in latency['buckets']] + ['>5000ms']
+            st.bar_chart(pd.DataFrame({'Turns': latency['counts']}, index=bucket_labels))
+        if snapshot['errors']:
+            st.dataframe(pd.DataFrame([
+                {'Stage': stage, 'Error': error_type, 'Count': count}
+                for stage, by_type in snapshot['errors'].items() for error_type, count in by_type.items()
+            ]), hide_index=True)
+        st.download_button("Download metrics (JSON)", perf.to_json(), file_name="metrics.json", mime="application/json")
+        st.download_button("Download metrics (Prometheus)", perf.to_prometheus(), file_name="metrics.prom", mime="text/plain")